@@ -1,12 +1,19 @@
 """Abstract base class for data source connectors."""
 
+import functools
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from typing import ClassVar
 
+import httpx
 
-@dataclass
+
+@dataclass(slots=True)
 class SearchResult:
-    """A single search result from a data source."""
+    """A single search result from a data source.
+
+    Slotted: large searches hold thousands of these, so no per-instance ``__dict__``.
+    """
 
     source_name: str
     source_url: str
@@ -51,3 +58,30 @@ class BaseConnector(ABC):
     @abstractmethod
     def download(self, url: str, dest_dir: str, filename: str | None = None) -> str:
         """Download a file and return the local path."""
+
+
+class PooledConnector(BaseConnector):
+    """Connector that sends its requests through a pooled ``httpx.Client``.
+
+    Instances of a class share one client, so connections stay alive between
+    requests. An injected ``client`` (e.g. on a MockTransport in tests) replaces it.
+    """
+
+    # Keyword arguments for the shared client (pool limits, HTTP/2)
+    CLIENT_OPTIONS: ClassVar[dict] = {}
+
+    def __init__(self, client: httpx.Client | None = None) -> None:
+        self._client = client
+
+    @property
+    def _http(self) -> httpx.Client:
+        return self._client or _shared_client(type(self))
+
+
+@functools.cache
+def _shared_client(cls: type[PooledConnector]) -> httpx.Client:
+    """Pooled client for *cls*, created on first use.
+
+    Building a client (SSL context) is too slow for import time.
+    """
+    return httpx.Client(**cls.CLIENT_OPTIONS)
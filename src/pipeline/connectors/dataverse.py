@@ -1,13 +1,14 @@
 """Dataverse API connector — works for any Dataverse installation."""
 
 import logging
-import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
 
 from pipeline.connectors.base import BaseConnector, SearchResult
+from pipeline.utils.text import strip_html
 
 logger = logging.getLogger("pipeline")
 
@@ -22,6 +23,9 @@ RETRY_DELAY = 2.0  # seconds, doubles each retry
 # Maximum datasets returned by search (prevents runaway pagination on large instances)
 MAX_SEARCH_RESULTS = 500
 
+# Search pages fetched in parallel once the first page reports the total count
+SEARCH_PAGE_WORKERS = 4
+
 
 class DataverseConnector(BaseConnector):
     """Connector for Dataverse-based repositories.
@@ -42,29 +46,23 @@ class DataverseConnector(BaseConnector):
         return self._instance_name
 
     def search(self, query: str, file_type: str | None = None) -> list[SearchResult]:
-        """Search datasets via the Dataverse Search API, with pagination."""
-        results: list[SearchResult] = []
+        """Search datasets via the Dataverse Search API, with pagination.
+
+        The first page gives the total count; the remaining pages (up to
+        MAX_SEARCH_RESULTS) are then fetched concurrently and parsed in order.
+        """
         per_page = 100
-        start = 0
-        total_count = 0
-
-        while True:
-            params: dict[str, str | int] = {
-                "q": query,
-                "type": "dataset",
-                "per_page": per_page,
-                "start": start,
-                "fq": "-isHarvested:true",
-            }
+        first = self._search_page(query, 0, per_page)
+        total_count = first.get("total_count", 0)
 
-            resp = httpx.get(
-                f"{self._base_url}/api/search",
-                params=params,
-                timeout=REQUEST_TIMEOUT,
-            )
-            resp.raise_for_status()
-            data = resp.json().get("data", {})
+        pages = [first]
+        starts = range(per_page, min(total_count, MAX_SEARCH_RESULTS), per_page)
+        if starts:
+            with ThreadPoolExecutor(max_workers=SEARCH_PAGE_WORKERS) as pool:
+                pages.extend(pool.map(lambda s: self._search_page(query, s, per_page), starts))
 
+        results: list[SearchResult] = []
+        for data in pages:
             items = data.get("items", [])
             if not items:
                 break
@@ -87,11 +85,6 @@ class DataverseConnector(BaseConnector):
                     )
                 results.append(result)
 
-            total_count = data.get("total_count", 0)
-            start += per_page
-            if start >= total_count or len(results) >= MAX_SEARCH_RESULTS:
-                break
-
         if len(results) > MAX_SEARCH_RESULTS:
             results = results[:MAX_SEARCH_RESULTS]
 
@@ -107,6 +100,23 @@ class DataverseConnector(BaseConnector):
             )
         return results
 
+    def _search_page(self, query: str, start: int, per_page: int) -> dict:
+        """Fetch one page of dataset search results (the response's ``data`` object)."""
+        params: dict[str, str | int] = {
+            "q": query,
+            "type": "dataset",
+            "per_page": per_page,
+            "start": start,
+            "fq": "-isHarvested:true",
+        }
+        resp = httpx.get(
+            f"{self._base_url}/api/search",
+            params=params,
+            timeout=REQUEST_TIMEOUT,
+        )
+        resp.raise_for_status()
+        return resp.json().get("data", {})
+
     def get_metadata(self, record_url: str) -> SearchResult:
         """Fetch full dataset metadata including file list.
 
@@ -141,7 +151,7 @@ class DataverseConnector(BaseConnector):
         description = ""
         if isinstance(description_list, list) and description_list:
             raw = description_list[0].get("dsDescriptionValue", {}).get("value", "")
-            description = _strip_html(raw)
+            description = strip_html(raw)
 
         authors_list = _get_field_value(fields, "author", [])
         author_names = []
@@ -203,7 +213,7 @@ class DataverseConnector(BaseConnector):
         publications = []
         if isinstance(pub_list, list):
             for pub in pub_list:
-                citation_text = _strip_html(pub.get("publicationCitation", {}).get("value", ""))
+                citation_text = strip_html(pub.get("publicationCitation", {}).get("value", ""))
                 pub_url = pub.get("publicationURL", {}).get("value", "")
                 entry = citation_text or pub_url
                 if entry:
@@ -334,12 +344,6 @@ class DataverseConnector(BaseConnector):
         return None
 
 
-def _strip_html(text: str) -> str:
-    """Remove HTML tags and collapse whitespace."""
-    clean = re.sub(r"<[^>]+>", " ", text)
-    return re.sub(r"\s+", " ", clean).strip()
-
-
 def _get_field_value(fields: dict, type_name: str, default=None):
     """Extract the value from a Dataverse metadata field dict."""
     field = fields.get(type_name)
@@ -1,6 +1,5 @@
 """Dryad REST API v2 connector for public datasets."""
 
-import html
 import logging
 import re
 import time
@@ -10,6 +9,7 @@ from urllib.parse import quote
 import httpx
 
 from pipeline.connectors.base import BaseConnector, SearchResult
+from pipeline.utils.text import strip_html
 
 logger = logging.getLogger("pipeline")
 
@@ -74,7 +74,7 @@ class DryadConnector(BaseConnector):
 
             for item in items:
                 title = item.get("title", "")
-                abstract = _strip_html(item.get("abstract", ""))
+                abstract = strip_html(item.get("abstract", ""), unescape=True)
 
                 authors_list = item.get("authors", [])
                 author_names = "; ".join(
@@ -139,8 +139,8 @@ class DryadConnector(BaseConnector):
 
         # Basic metadata
         title = data.get("title", "")
-        abstract = _strip_html(data.get("abstract", ""))
-        methods = _strip_html(data.get("methods", ""))
+        abstract = strip_html(data.get("abstract", ""), unescape=True)
+        methods = strip_html(data.get("methods", ""), unescape=True)
         description = abstract
         if methods:
             description = f"{abstract}\n\nMethods: {methods}" if abstract else methods
@@ -357,15 +357,6 @@ class DryadConnector(BaseConnector):
                     raise
 
 
-def _strip_html(text: str) -> str:
-    """Remove HTML tags, decode entities, and collapse whitespace."""
-    if not text:
-        return ""
-    clean = re.sub(r"<[^>]+>", " ", text)
-    clean = html.unescape(clean)
-    return re.sub(r"\s+", " ", clean).strip()
-
-
 def _extract_doi(url: str) -> str:
     """Extract DOI from a Dryad URL or bare DOI string.
 
@@ -1,5 +1,7 @@
 """UK Data Service (ReShare) connector via EPrints JSON export."""
 
+import functools
+import json
 import logging
 import re
 import time
@@ -7,7 +9,8 @@ from pathlib import Path
 
 import httpx
 
-from pipeline.connectors.base import BaseConnector, SearchResult
+from pipeline.connectors.base import PooledConnector, SearchResult
+from pipeline.utils.text import strip_html
 
 logger = logging.getLogger("pipeline")
 
@@ -24,11 +27,14 @@ MIN_REQUEST_INTERVAL = 2.0
 
 BASE_URL = "https://reshare.ukdataservice.ac.uk"
 
+# Raw record exports remembered per connector, so repeat lookups skip the network
+RECORD_CACHE_SIZE = 512
+
 # EPrints auto-generated files to skip
-_SKIP_FILENAMES = {
+_SKIP_FILENAMES = frozenset({
     "lightbox.jpg", "preview.jpg", "medium.jpg", "small.jpg",
     "indexcodes.txt",
-}
+})
 
 # License mapping from EPrints identifiers to standard names
 _LICENSE_MAP = {
@@ -41,12 +47,34 @@ _LICENSE_MAP = {
     "cc_public_domain": "CC0-1.0",
 }
 
+# Canonical URLs for the standard names above (built once, not per lookup)
+_LICENSE_URLS = {
+    "CC-BY-4.0": "https://creativecommons.org/licenses/by/4.0/",
+    "CC-BY-SA-4.0": "https://creativecommons.org/licenses/by-sa/4.0/",
+    "CC-BY-NC-4.0": "https://creativecommons.org/licenses/by-nc/4.0/",
+    "CC-BY-NC-SA-4.0": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
+    "CC-BY-ND-4.0": "https://creativecommons.org/licenses/by-nd/4.0/",
+    "CC-BY-NC-ND-4.0": "https://creativecommons.org/licenses/by-nc-nd/4.0/",
+    "CC0-1.0": "https://creativecommons.org/publicdomain/zero/1.0/",
+}
+
+# Fallbacks for ID extraction when the ID is not simply the last path segment
+_EPRINT_ID_RE = re.compile(r"/id/eprint/(\d+)")
+_DOC_ID_RE = re.compile(r"/id/document/(\d+)")
 
-class UKDataServiceConnector(BaseConnector):
+
+class UKDataServiceConnector(PooledConnector):
     """Connector for the UK Data Service ReShare repository."""
 
-    def __init__(self) -> None:
+    CLIENT_OPTIONS = {"limits": httpx.Limits(max_keepalive_connections=10)}
+
+    def __init__(self, client: httpx.Client | None = None) -> None:
+        super().__init__(client)
         self._last_request_time = 0.0
+        # Keyed by eprint ID so every URL form of a record shares one entry
+        self._fetch_record = functools.lru_cache(maxsize=RECORD_CACHE_SIZE)(
+            self._fetch_record_body
+        )
 
     @property
     def name(self) -> str:
@@ -72,7 +100,7 @@ class UKDataServiceConnector(BaseConnector):
             "_satisfyall": "ALL",
             "_action_search": "Search",
         }
-        resp = httpx.get(
+        resp = self._http.get(
             f"{BASE_URL}/cgi/search/simple/export_reshare_JSON.js",
             params=params,
             timeout=REQUEST_TIMEOUT,
@@ -97,9 +125,7 @@ class UKDataServiceConnector(BaseConnector):
                     continue
 
             creators = item.get("creators", [])
-            author_names = "; ".join(
-                _format_creator(c) for c in creators if _format_creator(c)
-            )
+            author_names = _join_creators(creators)
 
             keywords = [str(kw) for kw in (item.get("keywords", []) or [])]
 
@@ -107,7 +133,7 @@ class UKDataServiceConnector(BaseConnector):
                 source_name="ukds",
                 source_url=f"{BASE_URL}/{eprint_id}/",
                 title=item.get("title", ""),
-                description=_strip_html(item.get("abstract", "")),
+                description=strip_html(item.get("abstract", "")),
                 authors=author_names,
                 date_published=_normalize_date(item.get("date", "")),
                 keywords=keywords,
@@ -118,6 +144,17 @@ class UKDataServiceConnector(BaseConnector):
         logger.info("Search '%s' on ukds returned %d records", query, len(results))
         return results
 
+    def _fetch_record_body(self, eprint_id: str) -> bytes:
+        """Fetch the raw JSON export of one record."""
+        self._throttle()
+        resp = self._http.get(
+            f"{BASE_URL}/cgi/export/eprint/{eprint_id}"
+            f"/JSON/reshare-eprint-{eprint_id}.js",
+            timeout=REQUEST_TIMEOUT,
+        )
+        resp.raise_for_status()
+        return resp.content
+
     def get_metadata(self, record_url: str) -> SearchResult:
         """Fetch full metadata for a ReShare record.
 
@@ -126,27 +163,20 @@ class UKDataServiceConnector(BaseConnector):
         """
         eprint_id = _extract_eprint_id(record_url)
 
-        self._throttle()
-        resp = httpx.get(
-            f"{BASE_URL}/cgi/export/eprint/{eprint_id}"
-            f"/JSON/reshare-eprint-{eprint_id}.js",
-            timeout=REQUEST_TIMEOUT,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        # Cache the bytes, not the parsed record: every call decodes its own copy,
+        # so callers mutating the result's lists cannot corrupt the cache
+        data = json.loads(self._fetch_record(eprint_id))
 
-        # Single record can be dict or list with one element
-        if isinstance(data, list):
+        # Single record can be dict or list with one element (json only yields exact types)
+        if type(data) is list:
             data = data[0] if data else {}
 
         # Basic metadata
         title = data.get("title", "")
-        description = _strip_html(data.get("abstract", ""))
+        description = strip_html(data.get("abstract", ""))
 
         creators = data.get("creators", []) or []
-        author_names = "; ".join(
-            _format_creator(c) for c in creators if _format_creator(c)
-        )
+        author_names = _join_creators(creators)
 
         # Keywords — coerce to str; EPrints sometimes returns ints
         keywords = [str(kw) for kw in (data.get("keywords", []) or [])]
@@ -245,7 +275,7 @@ class UKDataServiceConnector(BaseConnector):
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                with httpx.stream(
+                with self._http.stream(
                     "GET", url, timeout=DOWNLOAD_TIMEOUT, follow_redirects=True
                 ) as resp:
                     resp.raise_for_status()
@@ -342,12 +372,6 @@ def _normalize_date(raw: str) -> str:
     return s
 
 
-def _strip_html(text: str) -> str:
-    """Remove HTML tags and collapse whitespace."""
-    clean = re.sub(r"<[^>]+>", " ", text)
-    return re.sub(r"\s+", " ", clean).strip()
-
-
 def _extract_eprint_id(url: str) -> str:
     """Extract eprint ID from a ReShare URL or bare ID.
 
@@ -356,19 +380,14 @@ def _extract_eprint_id(url: str) -> str:
         https://reshare.ukdataservice.ac.uk/id/eprint/857166
         857166
     """
-    # /id/eprint/{id} pattern
-    match = re.search(r"/id/eprint/(\d+)", url)
-    if match:
-        return match.group(1)
-    # /{id}/ pattern (numeric path segment)
-    match = re.search(r"/(\d+)/?$", url)
-    if match:
-        return match.group(1)
-    # Bare numeric ID
     stripped = url.strip().rstrip("/")
-    if stripped.isdigit():
-        return stripped
-    return stripped.split("/")[-1]
+    # /id/eprint/{id} pattern, possibly followed by more path
+    if "/id/eprint/" in stripped:
+        match = _EPRINT_ID_RE.search(stripped)
+        if match:
+            return match.group(1)
+    # Last path segment: /{id}/ or a bare numeric ID
+    return stripped.rpartition("/")[2]
 
 
 def _extract_doc_id(uri: str) -> str:
@@ -376,7 +395,10 @@ def _extract_doc_id(uri: str) -> str:
 
     E.g. 'http://reshare.ukdataservice.ac.uk/id/document/3744469' → '3744469'
     """
-    match = re.search(r"/id/document/(\d+)", uri)
+    head, _, tail = uri.rpartition("/")
+    if tail.isdigit() and head.endswith("/id/document"):
+        return tail
+    match = _DOC_ID_RE.search(uri)
     return match.group(1) if match else ""
 
 
@@ -388,6 +410,11 @@ def _format_creator(creator: dict) -> str:
     return f"{given} {family}".strip()
 
 
+def _join_creators(creators: list) -> str:
+    """Join formatted creator names with '; ', skipping empty ones (one format per creator)."""
+    return "; ".join(filter(None, map(_format_creator, creators)))
+
+
 def _is_open_license(license_str: str) -> bool:
     """Check if an EPrints license string is an open license."""
     return license_str in _LICENSE_MAP
@@ -415,13 +442,4 @@ def _pick_license(licenses: list[str]) -> str:
 
 def _license_url(license_type: str) -> str:
     """Return a URL for a standard license type."""
-    urls = {
-        "CC-BY-4.0": "https://creativecommons.org/licenses/by/4.0/",
-        "CC-BY-SA-4.0": "https://creativecommons.org/licenses/by-sa/4.0/",
-        "CC-BY-NC-4.0": "https://creativecommons.org/licenses/by-nc/4.0/",
-        "CC-BY-NC-SA-4.0": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
-        "CC-BY-ND-4.0": "https://creativecommons.org/licenses/by-nd/4.0/",
-        "CC-BY-NC-ND-4.0": "https://creativecommons.org/licenses/by-nc-nd/4.0/",
-        "CC0-1.0": "https://creativecommons.org/publicdomain/zero/1.0/",
-    }
-    return urls.get(license_type, "")
+    return _LICENSE_URLS.get(license_type, "")
@@ -1,13 +1,20 @@
 """Zenodo REST API connector for public records."""
 
+import copy
 import logging
+import random
 import re
+import threading
 import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
+import orjson
 
-from pipeline.connectors.base import BaseConnector, SearchResult
+from pipeline.connectors.base import PooledConnector, SearchResult
+from pipeline.utils.text import strip_html
 
 logger = logging.getLogger("pipeline")
 
@@ -15,126 +22,276 @@ logger = logging.getLogger("pipeline")
 REQUEST_TIMEOUT = 30.0
 DOWNLOAD_TIMEOUT = 120.0
 
+# Read size for streamed downloads: 1 MiB keeps write calls per file low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
 # Retry settings
 MAX_RETRIES = 3
 RETRY_DELAY = 2.0  # seconds, doubles each retry
 
-# Rate limiting: 2 seconds between API calls (well within 30 req/min)
+# API responses worth retrying (rate limited / gateway trouble); a Retry-After
+# header, capped at MAX_RETRY_AFTER, overrides the jittered backoff. The same cap
+# bounds waits for an X-RateLimit-Reset time (clock skew, millisecond values).
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_AFTER = 60.0
+
+# Rate limiting: a token bucket refilled every 2 seconds (30 req/min, well within
+# Zenodo's guest limit), allowing short bursts of up to RATE_LIMIT_BURST requests
 MIN_REQUEST_INTERVAL = 2.0
+RATE_LIMIT_BURST = 5
 
 # Maximum results to fetch per search query (Zenodo hard-caps at page 400 = 10,000,
 # but broad queries return thousands of irrelevant results — cap early to avoid waste)
 MAX_SEARCH_RESULTS = 200
 
-
-class ZenodoConnector(BaseConnector):
+# Records requested per search page
+PAGE_SIZE = 25
+
+# Search results kept per connector for repeat queries (LRU, entries expire after the TTL)
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = 300.0  # seconds
+
+# Parsed records kept per connector, revalidated by ETag (If-None-Match) on reuse
+RECORD_CACHE_SIZE = 512
+
+# Record fetches in flight at once in get_metadata_many (still paced by the rate limiter)
+METADATA_WORKERS = 4
+
+# Record ID in https://zenodo.org/records/12345 and legacy /record/12345 URLs
+_RECORD_ID_RE = re.compile(r"/records?/(\d+)")
+
+
+class _RateLimiter:
+    """Token bucket that also honours Zenodo's X-RateLimit-* response headers."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # Waiting happens under the lock, so concurrent callers queue in turn
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent, then spend one token."""
+        with self._lock:
+            self._acquire()
+
+    def _acquire(self) -> None:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            time.sleep(self._blocked_until - now)
+            now = time.monotonic()
+
+        # Read per call so the interval can be patched (e.g. to 0 in tests)
+        interval = MIN_REQUEST_INTERVAL
+        if interval <= 0:
+            self.tokens = float(self.capacity)
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) / interval)
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) * interval)
+                self.tokens = 1.0
+                now = time.monotonic()
+        self._updated = now
+        self.tokens -= 1
+
+    def update_from_headers(self, headers) -> None:
+        """Hold further requests until the reset time once the server quota is spent."""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            exhausted = int(remaining) <= 0
+            reset_at = float(reset)  # epoch seconds
+        except ValueError:
+            return
+        if exhausted:
+            wait = min(max(0.0, reset_at - time.time()), MAX_RETRY_AFTER)
+            with self._lock:
+                self._blocked_until = time.monotonic() + wait
+
+
+class ZenodoConnector(PooledConnector):
     """Connector for the Zenodo open-access repository."""
 
     BASE_URL = "https://zenodo.org/api"
 
-    def __init__(self) -> None:
-        self._last_request_time = 0.0
+    # HTTP/2 where the server offers it, so concurrent get_metadata_many fetches
+    # share one multiplexed connection
+    CLIENT_OPTIONS = {
+        "http2": True,
+        "limits": httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    }
+
+    def __init__(self, client: httpx.Client | None = None) -> None:
+        super().__init__(client)
+        self._limiter = _RateLimiter(RATE_LIMIT_BURST)
+        # (query, file_type) -> (fetched at, results), least recently used first
+        self._searches: dict[tuple, tuple[float, tuple[SearchResult, ...]]] = {}
+        # record ID -> (ETag, parsed record); a 304 reuses the parse, not just the body
+        self._records: dict[str, tuple[str, SearchResult]] = {}
+        # get_metadata runs on the get_metadata_many pool; guards _records
+        self._records_lock = threading.Lock()
 
     @property
     def name(self) -> str:
         return "zenodo"
 
     def _throttle(self) -> None:
-        """Enforce minimum interval between API requests."""
-        elapsed = time.monotonic() - self._last_request_time
-        if elapsed < MIN_REQUEST_INTERVAL:
-            time.sleep(MIN_REQUEST_INTERVAL - elapsed)
-        self._last_request_time = time.monotonic()
-
-    def search(self, query: str, file_type: str | None = None) -> list[SearchResult]:
-        """Search Zenodo records, with pagination."""
-        results: list[SearchResult] = []
-        page = 1
-        per_page = 25
+        """Wait for the rate limiter before an API request."""
+        self._limiter.acquire()
 
+    def _api_get(self, url: str, **kwargs) -> httpx.Response:
+        """GET an API URL under the rate limiter, retrying 429 and 5xx gateway errors.
+
+        Waits Retry-After when the server sends it, else an exponential backoff
+        with jitter. The last response is returned as-is for the caller to check.
+        """
+        attempt = 1
         while True:
             self._throttle()
+            resp = self._http.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+            self._limiter.update_from_headers(resp.headers)
+            if resp.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+                return resp
+
+            delay = _retry_after(resp.headers)
+            if delay is None:
+                backoff = RETRY_DELAY * (2 ** (attempt - 1))
+                delay = random.uniform(backoff / 2, backoff)
+            logger.warning(
+                "Zenodo returned %d for %s (attempt %d/%d). Retrying in %.1fs...",
+                resp.status_code, url, attempt, MAX_RETRIES, delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def search(
+        self,
+        query: str,
+        file_type: str | Iterable[str] | None = None,
+        *,
+        refresh: bool = False,
+    ) -> list[SearchResult]:
+        """Search Zenodo records, with pagination.
+
+        ``file_type`` is one extension or several (e.g. ``["qdpx", ".nvp"]``).
+        Results are cached for SEARCH_CACHE_TTL seconds per (query, file_type);
+        pass ``refresh=True`` to bypass the cache and re-fetch.
+        """
+        wanted = _wanted_extensions(file_type)
+        key = (" ".join(query.split()), wanted)
+        now = time.monotonic()
+        cached = self._searches.pop(key, None)
+        if cached and not refresh and now - cached[0] < SEARCH_CACHE_TTL:
+            self._searches[key] = cached  # re-insert as most recently used
+            return copy.deepcopy(list(cached[1]))
+
+        results = list(self._isearch(query, wanted))
+        logger.info("Search '%s' on zenodo returned %d records", query, len(results))
+
+        if len(self._searches) >= SEARCH_CACHE_SIZE:
+            self._searches.pop(next(iter(self._searches)), None)
+        self._searches[key] = (now, tuple(copy.deepcopy(results)))
+        return results
+
+    def isearch(
+        self, query: str, file_type: str | Iterable[str] | None = None
+    ) -> Iterator[SearchResult]:
+        """Yield search results page by page as each page is parsed.
+
+        Lets callers start on the first records before later pages are fetched.
+        """
+        return self._isearch(query, _wanted_extensions(file_type))
+
+    def _isearch(self, query: str, wanted: frozenset[str] | None) -> Iterator[SearchResult]:
+        """Paginate a search, keeping hits with a file extension in *wanted* (if set).
+
+        Takes the normalized set so a one-shot ``file_type`` iterable is consumed once.
+        """
+        count = 0
+        page = 1
+
+        while True:
             params: dict[str, str | int] = {
                 "q": query,
-                "size": per_page,
+                "size": PAGE_SIZE,
                 "page": page,
             }
-            resp = httpx.get(
-                f"{self.BASE_URL}/records",
-                params=params,
-                timeout=REQUEST_TIMEOUT,
-            )
+            resp = self._api_get(f"{self.BASE_URL}/records", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
             hits = data.get("hits", {})
             items = hits.get("hits", [])
             if not items:
-                break
+                return
 
             for item in items:
-                meta = item.get("metadata", {})
-
-                # Client-side file_type filtering
-                if file_type:
-                    ext = file_type if file_type.startswith(".") else f".{file_type}"
-                    file_entries = item.get("files", [])
-                    has_match = any(f.get("key", "").endswith(ext) for f in file_entries)
-                    if not has_match:
-                        continue
+                # Filter before parsing, so skipped records cost no HTML stripping
+                if wanted and not any(
+                    _file_extension(f.get("key", "")).lower() in wanted
+                    for f in item.get("files", [])
+                ):
+                    continue
 
+                meta = item.get("metadata", {})
                 record_id = item.get("id", "")
-                creators = meta.get("creators", [])
-                author_names = "; ".join(c.get("name", "") for c in creators if c.get("name"))
+                keywords = meta.get("keywords", [])
 
-                result = SearchResult(
+                count += 1
+                yield SearchResult(
                     source_name="zenodo",
                     source_url=f"https://zenodo.org/records/{record_id}",
                     title=meta.get("title", ""),
-                    description=_strip_html(meta.get("description", "")),
-                    authors=author_names,
+                    description=strip_html(meta.get("description", ""), unescape=True),
+                    authors=_join_creators(meta.get("creators", [])),
                     date_published=meta.get("publication_date", ""),
-                    keywords=meta.get("keywords", []),
-                    tags=meta.get("keywords", []),
+                    keywords=keywords,
+                    tags=keywords,
                 )
-                results.append(result)
 
             total = hits.get("total", 0)
-            if page * per_page >= total:
-                break
-            if len(results) >= MAX_SEARCH_RESULTS:
+            if page * PAGE_SIZE >= total:
+                return
+            if count >= MAX_SEARCH_RESULTS:
                 logger.info(
                     "Search '%s' capped at %d results (total available: %d)",
-                    query, len(results), total,
+                    query, count, total,
                 )
-                break
+                return
             page += 1
 
-        logger.info("Search '%s' on zenodo returned %d records", query, len(results))
-        return results
-
     def get_metadata(self, record_url: str) -> SearchResult:
         """Fetch full metadata for a Zenodo record.
 
         Accepts URLs like https://zenodo.org/records/12345 or just the numeric ID.
         """
         record_id = _extract_record_id(record_url)
+        with self._records_lock:
+            cached = self._records.get(record_id)
 
-        self._throttle()
-        resp = httpx.get(
+        resp = self._api_get(
             f"{self.BASE_URL}/records/{record_id}",
-            timeout=REQUEST_TIMEOUT,
+            headers={"If-None-Match": cached[0]} if cached else None,
         )
+        if cached and resp.status_code == 304:
+            # Copies in and out: callers may mutate the lists of what they get back
+            result = copy.deepcopy(cached[1])
+            result.source_url = record_url
+            return result
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         meta = data.get("metadata", {})
 
         # Basic metadata
         title = meta.get("title", "")
-        description = _strip_html(meta.get("description", ""))
+        description = strip_html(meta.get("description", ""), unescape=True)
 
         creators = meta.get("creators", [])
-        author_names = "; ".join(c.get("name", "") for c in creators if c.get("name"))
+        author_names = _join_creators(creators)
 
         # License
         license_info = meta.get("license", {})
@@ -154,7 +311,7 @@ class ZenodoConnector(BaseConnector):
 
         # Contributors → producer
         contributors = meta.get("contributors", [])
-        producers = [c.get("name", "") for c in contributors if c.get("name")]
+        producers = [name for c in contributors if (name := c.get("name"))]
 
         # Related identifiers → publication
         related = meta.get("related_identifiers", [])
@@ -173,25 +330,11 @@ class ZenodoConnector(BaseConnector):
         is_restricted = access_right != "open"
 
         # Files
-        files = []
-        for f in data.get("files", []):
-            key = f.get("key", "")
-            # Derive friendly_type from file extension (API has no type field)
-            ext = Path(key).suffix.lstrip(".") if key else ""
-            files.append({
-                "id": record_id,
-                "name": key,
-                "size": f.get("size", 0),
-                "download_url": f.get("links", {}).get("self", ""),
-                "api_checksum": f.get("checksum", ""),
-                "restricted": is_restricted,
-                "content_type": "",
-                "friendly_type": ext,
-            })
+        files = _build_file_list(record_id, data.get("files", []), is_restricted)
 
         license_url = f"https://spdx.org/licenses/{license_type}.html" if license_type else ""
 
-        return SearchResult(
+        result = SearchResult(
             source_name="zenodo",
             source_url=record_url,
             title=title,
@@ -214,6 +357,34 @@ class ZenodoConnector(BaseConnector):
             files=files,
         )
 
+        etag = resp.headers.get("ETag")
+        if etag:
+            entry = (etag, copy.deepcopy(result))
+            with self._records_lock:
+                if record_id not in self._records and len(self._records) >= RECORD_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del self._records[next(iter(self._records))]
+                self._records[record_id] = entry
+        return result
+
+    def get_metadata_many(self, record_urls: list[str]) -> list[SearchResult]:
+        """Fetch metadata for several records concurrently, returned in input order.
+
+        Overlaps request latency across METADATA_WORKERS threads; the shared rate
+        limiter still bounds the request rate. On the first failure (in input
+        order) fetches not yet started are cancelled and the error is re-raised.
+        """
+        if len(record_urls) <= 1:
+            return [self.get_metadata(url) for url in record_urls]
+        with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as pool:
+            futures = [pool.submit(self.get_metadata, url) for url in record_urls]
+            try:
+                return [future.result() for future in futures]
+            except Exception:
+                # Otherwise leaving the block would wait out every queued fetch
+                pool.shutdown(cancel_futures=True)
+                raise
+
     def download(self, url: str, dest_dir: str, filename: str | None = None) -> str:
         """Download a file from Zenodo. Returns local file path.
 
@@ -224,7 +395,7 @@ class ZenodoConnector(BaseConnector):
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                with httpx.stream(
+                with self._http.stream(
                     "GET", url, timeout=DOWNLOAD_TIMEOUT, follow_redirects=True
                 ) as resp:
                     resp.raise_for_status()
@@ -234,7 +405,7 @@ class ZenodoConnector(BaseConnector):
 
                     file_path = dest / filename
                     with open(file_path, "wb") as f:
-                        for chunk in resp.iter_bytes(chunk_size=8192):
+                        for chunk in resp.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                             f.write(chunk)
 
                 logger.info("Downloaded %s -> %s", url, file_path)
@@ -251,19 +422,63 @@ class ZenodoConnector(BaseConnector):
                     raise
 
 
-def _strip_html(text: str) -> str:
-    """Remove HTML tags, decode entities, and collapse whitespace."""
-    import html
-
-    clean = re.sub(r"<[^>]+>", " ", text)
-    clean = html.unescape(clean)
-    return re.sub(r"\s+", " ", clean).strip()
+def _build_file_list(record_id: str, entries: list, restricted: bool) -> list[dict]:
+    """Build file dicts from a record's file entries in one pass."""
+    return [
+        {
+            "id": record_id,
+            "name": key,
+            "size": f.get("size", 0),
+            "download_url": f.get("links", {}).get("self", ""),
+            "api_checksum": f.get("checksum", ""),
+            "restricted": restricted,
+            "content_type": "",
+            # Derived from the file extension (the API has no type field)
+            "friendly_type": _file_extension(key),
+        }
+        for f in entries
+        for key in (f.get("key", ""),)
+    ]
+
+
+def _retry_after(headers) -> float | None:
+    """Seconds from a numeric Retry-After header, capped at MAX_RETRY_AFTER."""
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except ValueError:
+        return None  # HTTP-date form: fall back to backoff
+
+
+def _wanted_extensions(file_type: str | Iterable[str] | None) -> frozenset[str] | None:
+    """Normalize one or more file types (with or without the dot) to a lowercase set."""
+    if not file_type:
+        return None
+    types = [file_type] if isinstance(file_type, str) else file_type
+    return frozenset(t.lstrip(".").lower() for t in types) or None
+
+
+def _file_extension(name: str) -> str:
+    """Extension of a file key without the dot, by Path.suffix rules, minus the Path object."""
+    base = name.rpartition("/")[2]
+    i = base.rfind(".")
+    return base[i + 1 :] if 0 < i < len(base) - 1 else ""
+
+
+def _join_creators(creators: list) -> str:
+    """Join non-empty creator names with "; ", looking each name up once."""
+    return "; ".join(filter(None, [c.get("name") for c in creators]))
 
 
 def _extract_record_id(url: str) -> str:
     """Extract numeric record ID from a Zenodo URL or bare ID string."""
+    # Bare numeric ID, the common case for callers passing IDs directly
+    if url.isdigit():
+        return url
     # Handle URLs like https://zenodo.org/records/12345 or /record/12345
-    match = re.search(r"/records?/(\d+)", url)
+    match = _RECORD_ID_RE.search(url)
     if match:
         return match.group(1)
     # Bare numeric ID
@@ -21,10 +21,12 @@ def slugify(text: str, max_length: int = 60) -> str:
     text = re.sub(r"[^a-z0-9]+", "-", text)
     # Collapse multiple hyphens and strip leading/trailing
     text = re.sub(r"-{2,}", "-", text).strip("-")
-    # Truncate on word boundary
-    if len(text) > max_length:
-        text = text[:max_length].rsplit("-", 1)[0]
-    return text
+    if len(text) <= max_length:
+        return text
+    # Truncate on word boundary (rfind avoids the list allocation of rsplit)
+    cut = text[:max_length]
+    idx = cut.rfind("-")
+    return cut[:idx] if idx > 0 else cut
 
 
 def get_storage_path(
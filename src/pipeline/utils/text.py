@@ -0,0 +1,25 @@
+"""Text cleanup shared by the connectors."""
+
+import html
+import re
+
+# A tag body cannot contain "<", so runs of unclosed "<" match in linear time
+_TAG_RE = re.compile(r"<[^<>]+>")
+_WS_RE = re.compile(r"\s+")
+# Zero-width characters pasted in from rich-text editors
+_INVISIBLE = str.maketrans("", "", "\u200b\u200c\u200d\u2060\ufeff")
+
+
+def strip_html(text: str, *, unescape: bool = False) -> str:
+    """Remove HTML tags and zero-width characters, and collapse whitespace.
+
+    With ``unescape``, HTML entities (including ``&nbsp;``) are decoded as well.
+    """
+    if not text:
+        return ""
+    # Plain text (no "<") skips the tag pass entirely
+    if "<" in text:
+        text = _TAG_RE.sub(" ", text)
+    if unescape:
+        text = html.unescape(text)
+    return _WS_RE.sub(" ", text.translate(_INVISIBLE)).strip()
@@ -0,0 +1,35 @@
+"""Payload fixtures and ``httpx.Response`` builders for connector tests."""
+
+import json
+from functools import cache
+from pathlib import Path
+from types import MappingProxyType
+
+import httpx
+import orjson
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def freeze(obj):
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+@cache
+def load_json(name: str):
+    """Load and freeze a JSON payload from ``tests/fixtures`` on first use."""
+    return freeze(orjson.loads((FIXTURES_DIR / name).read_bytes()))
+
+
+def json_response(payload, headers: dict | None = None) -> httpx.Response:
+    """A 200 JSON response for a (possibly frozen) payload."""
+    return httpx.Response(
+        200,
+        content=json.dumps(payload, default=dict),
+        headers={"content-type": "application/json", **(headers or {})},
+    )
@@ -0,0 +1,25 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+from pipeline.connectors import CONNECTORS
+
+
+@pytest.fixture(scope="session")
+def connectors():
+    """The connector registry, imported once for the whole session."""
+    return CONNECTORS
+
+
+@pytest.fixture(scope="module")
+def dl_root(tmp_path_factory):
+    """One download root per test module."""
+    return tmp_path_factory.mktemp("downloads")
+
+
+@pytest.fixture
+def dl_dir(dl_root, request):
+    """A fresh subdirectory of the module's download root for each test."""
+    path = dl_root / request.node.name
+    path.mkdir()
+    return path
@@ -0,0 +1,47 @@
+"""Tests for the connector base classes."""
+
+import httpx
+import pytest
+
+from pipeline.connectors.base import PooledConnector, _shared_client
+
+
+class _Pooled(PooledConnector):
+    CLIENT_OPTIONS = {"timeout": 1.0}
+
+    name = "pooled"
+
+    def search(self, query, file_type=None):
+        return []
+
+    def get_metadata(self, record_url):
+        raise NotImplementedError
+
+    def download(self, url, dest_dir, filename=None):
+        raise NotImplementedError
+
+
+class _OtherPooled(_Pooled):
+    pass
+
+
+@pytest.fixture
+def shared_clients():
+    # Close whatever shared clients the test built and forget them
+    yield
+    for cls in (_Pooled, _OtherPooled):
+        _shared_client(cls).close()
+    _shared_client.cache_clear()
+
+
+def test_default_client_is_shared_per_class(shared_clients):
+    client = _Pooled()._http
+
+    assert _Pooled()._http is client
+    assert client.timeout == httpx.Timeout(1.0)
+    assert _OtherPooled()._http is not client
+
+
+def test_injected_client_replaces_shared():
+    with httpx.Client() as client:
+        assert _Pooled(client=client)._http is client
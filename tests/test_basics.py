@@ -68,6 +68,10 @@ def test_slugify_truncation():
     assert not result.endswith("-")
 
 
+def test_slugify_truncation_without_hyphen():
+    assert slugify("abcdefghij", max_length=4) == "abcd"
+
+
 def test_slugify_empty():
     assert slugify("") == ""
 
@@ -5,211 +5,321 @@ from unittest.mock import MagicMock, patch
 import pytest
 from click.testing import CliRunner
 
-from pipeline.cli import cli
-from pipeline.db.connection import get_session
-from pipeline.db.models import File
 
+@pytest.fixture(scope="session")
+def db_engine():
+    """Build the in-memory engine and schema once for the whole test session."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
 
-@pytest.fixture(autouse=True)
-def isolated_db(tmp_path, monkeypatch):
-    """Use a temporary DB and data dir for every test."""
-    db_path = tmp_path / "test.db"
-    monkeypatch.setattr("pipeline.config.DB_PATH", db_path)
-    monkeypatch.setattr("pipeline.config.DB_URL", f"sqlite:///{db_path}")
-    monkeypatch.setattr("pipeline.config.DATA_DIR", tmp_path / "data")
-    monkeypatch.setattr("pipeline.config.EXPORTS_DIR", tmp_path / "exports")
-    monkeypatch.setattr("pipeline.config.LOG_FILE", tmp_path / "pipeline.log")
-
-    # Re-initialize engine with new DB_URL
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
+    from pipeline.db.models import Base
 
-    engine = create_engine(f"sqlite:///{db_path}", echo=False)
-    session_local = sessionmaker(bind=engine)
-    monkeypatch.setattr("pipeline.db.connection.engine", engine)
-    monkeypatch.setattr("pipeline.db.connection.SessionLocal", session_local)
+    # StaticPool: one shared in-memory connection, no pool bookkeeping
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
 
-    from pipeline.db.models import Base
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _record):
+        # Durability is irrelevant for a throwaway test DB
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA synchronous=OFF")
+        cur.execute("PRAGMA journal_mode=MEMORY")
+        cur.execute("PRAGMA locking_mode=EXCLUSIVE")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.close()
 
     Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
 
 
-@pytest.fixture
-def runner():
-    return CliRunner()
+@pytest.fixture(autouse=True)
+def isolated_db(db_engine, tmp_path, monkeypatch):
+    """Point the pipeline at the shared DB and a temporary data dir; wipe tables after."""
+    from sqlalchemy.orm import sessionmaker
 
+    from pipeline.db.models import Base
 
-@pytest.fixture
-def sample_records():
-    """Insert sample records into the DB."""
-    session = get_session()
-    session.add(File(
-        source_name="qdr", file_name="analysis.qdpx", file_type=".qdpx",
-        source_url="https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
-        download_url="https://data.qdr.syr.edu/api/access/datafile/12345",
-        title="Test Dataset", authors="Smith, J.", is_qda_file=True,
-        file_size_bytes=1024, notes="access restricted (403)",
-        keywords="qualitative research; interviews", language="English",
-        software="NVivo 12", restricted=True,
-        uploader_name="Smith, J.", uploader_email="smith@example.edu",
-        local_directory="test-dataset-doi_10.5064_F6ABC123",
-        depositor="Doe, A.", producer="University of Testing",
-        publication="Smith (2023) Qualitative Study",
-        date_of_collection="2022-01-01 to 2022-12-31",
-        time_period_covered="2020-01-01 to 2022-06-30",
-    ))
-    session.add(File(
-        source_name="qdr", file_name="transcript.pdf", file_type=".pdf",
-        source_url="https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
-        download_url="https://data.qdr.syr.edu/api/access/datafile/12346",
-        title="Test Dataset", authors="Smith, J.", is_qda_file=False,
-        file_size_bytes=2048, local_path="/tmp/transcript.pdf", file_hash="abc123",
-        keywords="focus groups", language="German",
-        software=None, restricted=False,
-    ))
-    session.commit()
-    session.close()
+    monkeypatch.setattr("pipeline.config.DB_PATH", tmp_path / "test.db")
+    monkeypatch.setattr("pipeline.config.DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr("pipeline.config.EXPORTS_DIR", tmp_path / "exports")
+    monkeypatch.setattr("pipeline.config.LOG_FILE", tmp_path / "pipeline.log")
+    monkeypatch.setattr("pipeline.db.connection.engine", db_engine)
+    monkeypatch.setattr(
+        "pipeline.db.connection.SessionLocal",
+        sessionmaker(bind=db_engine, expire_on_commit=False),
+    )
 
+    yield
 
-def test_status_empty(runner):
-    result = runner.invoke(cli, ["status"])
-    assert result.exit_code == 0
-    assert "Total records:" in result.output
-    assert "0" in result.output
+    with db_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
 
 
-def test_status_with_records(runner, sample_records):
-    result = runner.invoke(cli, ["status"])
-    assert result.exit_code == 0
-    assert "2" in result.output  # total
-    assert "qdr" in result.output
+@pytest.fixture(scope="session")
+def cli():
+    """The Click command group, imported lazily so collection stays cheap."""
+    from pipeline.cli import cli
 
+    return cli
 
-def test_list_sources(runner):
-    result = runner.invoke(cli, ["list-sources"])
-    assert result.exit_code == 0
-    assert "qdr" in result.output
-    assert "ready" in result.output
 
+@pytest.fixture(scope="module")
+def runner():
+    return CliRunner()
 
-def test_db_empty(runner):
-    result = runner.invoke(cli, ["db"])
-    assert result.exit_code == 0
-    assert "No records found" in result.output
 
+@pytest.fixture(scope="session")
+def seed_catalog():
+    """Seed scenarios keyed by name, built once per session.
+
+    Every row carries the same keys so a scenario goes through one Core executemany.
+    """
+    rows = [
+        dict(
+            source_name="qdr", file_name="analysis.qdpx", file_type=".qdpx",
+            source_url="https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
+            download_url="https://data.qdr.syr.edu/api/access/datafile/12345",
+            title="Test Dataset", authors="Smith, J.", is_qda_file=True,
+            file_size_bytes=1024, notes="access restricted (403)",
+            keywords="qualitative research; interviews", language="English",
+            software="NVivo 12", restricted=True,
+            uploader_name="Smith, J.", uploader_email="smith@example.edu",
+            local_directory="test-dataset-doi_10.5064_F6ABC123",
+            depositor="Doe, A.", producer="University of Testing",
+            publication="Smith (2023) Qualitative Study",
+            date_of_collection="2022-01-01 to 2022-12-31",
+            time_period_covered="2020-01-01 to 2022-06-30",
+        ),
+        dict(
+            source_name="qdr", file_name="transcript.pdf", file_type=".pdf",
+            source_url="https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
+            download_url="https://data.qdr.syr.edu/api/access/datafile/12346",
+            title="Test Dataset", authors="Smith, J.", is_qda_file=False,
+            file_size_bytes=2048, local_path="/tmp/transcript.pdf", file_hash="abc123",
+            keywords="focus groups", language="German",
+            software=None, restricted=False,
+        ),
+    ]
+    keys = set().union(*rows)
+    rows = [{k: row.get(k) for k in keys} for row in rows]
+    return {"both": rows, "qda_only": rows[:1], "none": []}
 
-def test_db_with_records(runner, sample_records):
-    result = runner.invoke(cli, ["db"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.p" in result.output  # may be truncated in table
 
+def _insert_rows(rows: list[dict]) -> None:
+    """Insert rows with a Core insert (no ORM flush) in a single commit."""
+    from pipeline.db.connection import get_session
+    from pipeline.db.models import File
 
-def test_db_qda_only(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--qda-only"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
+    if not rows:
+        return
+    session = get_session()
+    session.execute(File.__table__.insert(), rows)
+    session.commit()
+    session.close()
 
 
-def test_db_restricted_only(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--restricted-only"])
+@pytest.fixture
+def seeded(request, seed_catalog):
+    """Seed the scenario named by indirect parametrization (default: both rows)."""
+    _insert_rows(seed_catalog[getattr(request, "param", "both")])
+
+
+def _run_command(name: str, capsys) -> str:
+    """Call an argument-free command's callback directly and return its stdout.
+
+    Skips Click's argv parsing and context setup; the group callback is not
+    needed because the test schema already exists.
+    """
+    import pipeline.cli
+
+    getattr(pipeline.cli, name).callback()
+    return capsys.readouterr().out
+
+
+def test_status_empty(capsys):
+    output = _run_command("status", capsys)
+    assert "Total records:" in output
+    assert "0" in output
+
+
+def test_status_with_records(capsys, seeded):
+    output = _run_command("status", capsys)
+    assert "2" in output  # total
+    assert "qdr" in output
+
+
+def test_list_sources(capsys):
+    output = _run_command("list_sources", capsys)
+    assert "qdr" in output
+    assert "ready" in output
+
+
+# (args, seed scenario, expected in output, expected not in output)
+DB_CASES = [
+    pytest.param(["db"], "none", ["No records found"], [], id="empty"),
+    # transcript.pdf may be truncated in the table
+    pytest.param(["db"], "both", ["analysis.qdpx", "transcript.p"], [], id="with-records"),
+    pytest.param(
+        ["db", "--qda-only"], "both", ["analysis.qdpx"], ["transcript.pdf"], id="qda-only"
+    ),
+    # Filters by the restricted column, not local_path
+    pytest.param(
+        ["db", "--restricted-only"], "both", ["analysis.qdpx"], ["transcript.pdf"],
+        id="restricted-only",
+    ),
+    pytest.param(
+        ["db", "--search", "interview"], "both", ["analysis.qdpx"], ["transcript.pdf"],
+        id="search",
+    ),
+    pytest.param(
+        ["db", "--language", "english"], "both", ["analysis.qdpx"], ["transcript.pdf"],
+        id="language",
+    ),
+    pytest.param(
+        ["db", "--software", "nvivo"], "both", ["analysis.qdpx"], ["transcript.pdf"],
+        id="software",
+    ),
+    pytest.param(
+        ["db", "--file-type", ".pdf"], "both", ["transcript.p"], ["analysis.qdpx"],
+        id="file-type",
+    ),
+    pytest.param(
+        ["db", "--file-type", "pdf"], "both", ["transcript.p"], ["analysis.qdpx"],
+        id="file-type-auto-dot",
+    ),
+    pytest.param(
+        ["db", "--has-software"], "both", ["analysis.qdpx"], ["transcript.pdf"],
+        id="has-software",
+    ),
+    pytest.param(
+        ["db", "--has-keywords"], "both", ["analysis.qdpx", "transcript.p"], [],
+        id="has-keywords",
+    ),
+]
+
+SHOW_CASES = [
+    pytest.param(
+        ["show", "1"], "qda_only", ["analysis.qdpx", "Smith, J.", "restricted"], [], id="record"
+    ),
+    # Uploader, provenance, and local_directory fields
+    pytest.param(
+        ["show", "1"], "qda_only",
+        [
+            "smith@example.edu", "Smith, J.", "test-dataset-doi_10.5064_F6ABC123",
+            "Doe, A.", "University of Testing", "Smith (2023) Qualitative Study",
+            "2022-01-01 to 2022-12-31", "2020-01-01 to 2022-06-30",
+        ],
+        [],
+        id="new-fields",
+    ),
+    # Record 2 has no new fields — labels are still shown with dashes
+    pytest.param(["show", "2"], "both", ["Uploader:", "Depositor:"], [], id="empty-new-fields"),
+    pytest.param(
+        ["show", "1", "2"], "both", ["analysis.qdpx", "transcript.pdf"], [], id="multiple"
+    ),
+    pytest.param(["show", "999"], "none", ["not found"], [], id="not-found"),
+]
+
+
+@pytest.mark.parametrize(
+    "args, seeded, expect_in, expect_not_in", DB_CASES + SHOW_CASES, indirect=["seeded"]
+)
+def test_db_and_show(cli, runner, seeded, args, expect_in, expect_not_in):
+    result = runner.invoke(cli, args)
     assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
+    for text in expect_in:
+        assert text in result.output
+    for text in expect_not_in:
+        assert text not in result.output
 
 
-def test_show_record(runner, sample_records):
-    result = runner.invoke(cli, ["show", "1"])
+def test_export(cli, runner, seeded, tmp_path):
+    output = str(tmp_path / "exports" / "metadata.csv")
+    result = runner.invoke(cli, ["export", "-o", output])
     assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "Smith, J." in result.output
-    assert "restricted" in result.output
-
+    assert "Exported 2 records" in result.output
 
-def test_show_new_fields(runner, sample_records):
-    """Verify show command displays uploader, provenance, and local_directory fields."""
-    result = runner.invoke(cli, ["show", "1"])
-    assert result.exit_code == 0
-    assert "smith@example.edu" in result.output
-    assert "Smith, J." in result.output
-    assert "test-dataset-doi_10.5064_F6ABC123" in result.output
-    assert "Doe, A." in result.output
-    assert "University of Testing" in result.output
-    assert "Smith (2023) Qualitative Study" in result.output
-    assert "2022-01-01 to 2022-12-31" in result.output
-    assert "2020-01-01 to 2022-06-30" in result.output
-
-
-def test_show_empty_new_fields(runner, sample_records):
-    """Record 2 has no new fields — show should display dashes."""
-    result = runner.invoke(cli, ["show", "2"])
-    assert result.exit_code == 0
-    # The new fields should show '—' for record 2
-    assert "Uploader:" in result.output
-    assert "Depositor:" in result.output
 
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    """Swap the shared in-memory engine for a real DB file at ``config.DB_PATH``.
 
-def test_show_multiple(runner, sample_records):
-    result = runner.invoke(cli, ["show", "1", "2"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" in result.output
+    For tests of commands that delete the database file itself.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import NullPool
 
+    from pipeline.db.models import Base
 
-def test_show_not_found(runner):
-    result = runner.invoke(cli, ["show", "999"])
-    assert result.exit_code == 0
-    assert "not found" in result.output
+    # NullPool: no connection outlives a session, so a deleted file is reopened fresh
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    monkeypatch.setattr("pipeline.db.connection.engine", engine)
+    monkeypatch.setattr("pipeline.db.connection.SessionLocal", sessionmaker(bind=engine))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
 
 
-def test_export(runner, sample_records, tmp_path):
-    output = str(tmp_path / "exports" / "metadata.csv")
-    result = runner.invoke(cli, ["export", "-o", output])
-    assert result.exit_code == 0
-    assert "Exported 2 records" in result.output
+def test_reset_confirmed(cli, runner, file_db, seeded):
+    from sqlalchemy import func, select
 
+    from pipeline.db.models import File
 
-def test_reset_confirmed(runner, sample_records):
     result = runner.invoke(cli, ["reset", "-y"])
     assert result.exit_code == 0
     assert "Reset complete" in result.output
-    assert "Deleted" in result.output
+    assert "Deleted Database" in result.output
+
+    # The file was removed and re-created empty
+    with file_db.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(File)).scalar() == 0
 
 
-def test_reset_aborted(runner):
+def test_reset_aborted(cli, runner):
     result = runner.invoke(cli, ["reset"], input="n\n")
     assert result.exit_code == 0
     assert "Aborted" in result.output
 
 
-def test_search_unknown_source(runner):
+def test_search_unknown_source(cli, runner):
     result = runner.invoke(cli, ["search", "nonexistent"])
     assert result.exit_code == 1
     assert "Unknown source" in result.output
 
 
-def test_search_with_connector(runner):
-    mock_results = [
-        MagicMock(
+def test_search_with_connector(cli, runner):
+    from pipeline.connectors.base import SearchResult
+
+    mock_connector = MagicMock()
+    mock_connector.search.return_value = [
+        SearchResult(
+            source_name="test",
+            source_url="https://example.com/1",
             title="Test Dataset",
             authors="Doe, A.",
             date_published="2024-01-01",
-            source_url="https://example.com/1",
         )
     ]
-    mock_connector = MagicMock()
-    mock_connector.search.return_value = mock_results
 
-    with patch("pipeline.cli.CONNECTORS", {"test": mock_connector}):
+    with patch.dict("pipeline.cli.CONNECTORS", {"test": mock_connector}):
         result = runner.invoke(cli, ["search", "test", "-q", "qualitative"])
 
     assert result.exit_code == 0
     assert "Test Dataset" in result.output
 
 
-def test_scrape_skips_already_cataloged(runner, sample_records):
+def test_scrape_skips_already_cataloged(cli, runner, seeded):
     """Files already in DB by download_url are skipped without downloading."""
+    from pipeline.connectors.base import SearchResult
+    from pipeline.db.connection import get_session
+    from pipeline.db.models import File
+
     # Give the existing record a download_url to match against
     session = get_session()
     rec = session.query(File).filter_by(file_name="transcript.pdf").first()
@@ -217,30 +327,21 @@ def test_scrape_skips_already_cataloged(runner, sample_records):
     session.commit()
     session.close()
 
-    mock_result = MagicMock(
-        title="Test Dataset",
+    # Real dataclasses for the data; only the connector needs call tracking
+    mock_result = SearchResult(
+        source_name="qdr",
         source_url="https://example.com/dataset/1",
+        title="Test Dataset",
     )
-    mock_metadata = MagicMock(
-        license_type="CC BY 4.0",
-        license_url="https://creativecommons.org/licenses/by/4.0/",
+    mock_metadata = SearchResult(
+        source_name="qdr",
+        source_url="https://example.com/dataset/1",
         title="Test Dataset",
         description="qualitative interview transcripts",
         authors="Doe",
+        license_type="CC BY 4.0",
+        license_url="https://creativecommons.org/licenses/by/4.0/",
         date_published="2024-01-01",
-        tags=[],
-        keywords=[],
-        kind_of_data=[],
-        language=[],
-        software=[],
-        geographic_coverage=[],
-        depositor="",
-        producer=[],
-        publication=[],
-        date_of_collection="",
-        time_period_covered="",
-        uploader_name="",
-        uploader_email="",
         files=[{
             "name": "transcript.pdf",
             "download_url": "https://example.com/api/files/99/download",
@@ -253,7 +354,7 @@ def test_scrape_skips_already_cataloged(runner, sample_records):
     mock_connector.search.return_value = [mock_result]
     mock_connector.get_metadata.return_value = mock_metadata
 
-    with patch("pipeline.cli.CONNECTORS", {"qdr": mock_connector}):
+    with patch.dict("pipeline.cli.CONNECTORS", {"qdr": mock_connector}):
         result = runner.invoke(cli, ["scrape", "qdr", "-q", "test"])
 
     assert result.exit_code == 0
@@ -261,71 +362,12 @@ def test_scrape_skips_already_cataloged(runner, sample_records):
     mock_connector.download.assert_not_called()
 
 
-def test_db_search(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--search", "interview"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
-
-
-def test_db_language(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--language", "english"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
-
-
-def test_db_software(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--software", "nvivo"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
-
-
-def test_db_file_type(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--file-type", ".pdf"])
-    assert result.exit_code == 0
-    assert "transcript.p" in result.output
-    assert "analysis.qdpx" not in result.output
-
-
-def test_db_file_type_auto_dot(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--file-type", "pdf"])
-    assert result.exit_code == 0
-    assert "transcript.p" in result.output
-    assert "analysis.qdpx" not in result.output
-
-
-def test_db_has_software(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--has-software"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
-
-
-def test_db_has_keywords(runner, sample_records):
-    result = runner.invoke(cli, ["db", "--has-keywords"])
-    assert result.exit_code == 0
-    assert "analysis.qdpx" in result.output
-    assert "transcript.p" in result.output
-
-
-def test_db_restricted_only_uses_column(runner, sample_records):
-    """Verify --restricted-only filters by the restricted column, not local_path."""
-    result = runner.invoke(cli, ["db", "--restricted-only"])
-    assert result.exit_code == 0
-    # Record 1 has restricted=True, record 2 has restricted=False
-    assert "analysis.qdpx" in result.output
-    assert "transcript.pdf" not in result.output
-
-
-def test_status_extended(runner, sample_records):
-    result = runner.invoke(cli, ["status"])
-    assert result.exit_code == 0
-    assert "Restricted:" in result.output
-    assert "1" in result.output  # one restricted record
-    assert "By language:" in result.output
-    assert "English" in result.output
-    assert "German" in result.output
-    assert "By software:" in result.output
-    assert "NVivo 12" in result.output
+def test_status_extended(capsys, seeded):
+    output = _run_command("status", capsys)
+    assert "Restricted:" in output
+    assert "1" in output  # one restricted record
+    assert "By language:" in output
+    assert "English" in output
+    assert "German" in output
+    assert "By software:" in output
+    assert "NVivo 12" in output
@@ -1,16 +1,19 @@
 """Tests for the Dataverse connector with mocked HTTP responses."""
 
-from unittest.mock import MagicMock, patch
-
 import httpx
 import pytest
 
 from pipeline.connectors.base import BaseConnector
-from pipeline.connectors.dataverse import DataverseConnector, _filename_from_headers
+from pipeline.connectors.dataverse import (
+    DataverseConnector,
+    _filename_from_headers,
+)
+from tests._responses import freeze, json_response, load_json
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def connector():
+    # Stateless: tests patch the httpx layer, never the connector itself
     return DataverseConnector("https://data.qdr.syr.edu", "qdr")
 
 
@@ -25,9 +28,12 @@ def test_name_property(connector):
     assert connector.name == "qdr"
 
 
+BASE_URL = "https://data.qdr.syr.edu"
+
+
 # -- Search --
 
-SEARCH_RESPONSE = {
+SEARCH_RESPONSE = freeze({
     "status": "OK",
     "data": {
         "q": "qualitative",
@@ -56,16 +62,15 @@ SEARCH_RESPONSE = {
             },
         ],
     },
-}
+})
 
 
-def test_search_parses_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
+def test_search_parses_results(connector, respx_mock):
+    route = respx_mock.get(f"{BASE_URL}/api/search").mock(
+        return_value=json_response(SEARCH_RESPONSE)
+    )
 
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        results = connector.search("qualitative")
+    results = connector.search("qualitative")
 
     assert len(results) == 2
     assert results[0].title == "Interview Dataset A"
@@ -75,369 +80,223 @@ def test_search_parses_results(connector):
     assert results[1].title == "Focus Group Data"
 
     # Verify correct URL was called
-    mock_get.assert_called_once()
-    call_args = mock_get.call_args
-    assert "/api/search" in call_args[0][0]
-    assert call_args[1]["params"]["q"] == "qualitative"
-    assert call_args[1]["params"]["type"] == "dataset"
+    assert route.call_count == 1
+    params = route.calls.last.request.url.params
+    assert params["q"] == "qualitative"
+    assert params["type"] == "dataset"
 
 
-def test_search_empty_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = {"status": "OK", "data": {"items": [], "total_count": 0}}
-    mock_resp.raise_for_status = MagicMock()
+def test_search_empty_results(connector, respx_mock):
+    respx_mock.get(f"{BASE_URL}/api/search").mock(
+        return_value=httpx.Response(
+            200, json={"status": "OK", "data": {"items": [], "total_count": 0}}
+        )
+    )
 
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("nonexistent")
+    results = connector.search("nonexistent")
 
     assert results == []
 
 
-# -- Get metadata --
+def _search_page(request: httpx.Request) -> httpx.Response:
+    """Serve 750 numbered datasets, 100 per page, paged by the ``start`` param."""
+    start = int(request.url.params["start"])
+    items = [
+        {"name": f"Dataset {i}", "url": f"{BASE_URL}/d/{i}"}
+        for i in range(start, min(start + 100, 750))
+    ]
+    return httpx.Response(200, json={"data": {"items": items, "total_count": 750}})
 
-DATASET_RESPONSE = {
-    "status": "OK",
-    "data": {
-        "latestVersion": {
-            "releaseTime": "2023-06-15T00:00:00Z",
-            "license": {"name": "CC0 1.0", "uri": "https://creativecommons.org/publicdomain/zero/1.0/"},
-            "termsOfAccess": "Freely available",
-            "metadataBlocks": {
-                "citation": {
-                    "fields": [
-                        {"typeName": "title", "value": "Interview Dataset A"},
-                        {
-                            "typeName": "dsDescription",
-                            "value": [
-                                {"dsDescriptionValue": {"value": "A qualitative interview dataset"}}
-                            ],
-                        },
-                        {
-                            "typeName": "author",
-                            "value": [
-                                {"authorName": {"value": "Smith, J."}},
-                                {"authorName": {"value": "Doe, A."}},
-                            ],
-                        },
-                        {"typeName": "subject", "value": ["Social Sciences"]},
-                        {
-                            "typeName": "keyword",
-                            "value": [
-                                {"keywordValue": {"value": "qualitative research"}},
-                                {"keywordValue": {"value": "interviews"}},
-                            ],
-                        },
-                        {
-                            "typeName": "kindOfData",
-                            "value": ["interview transcripts", "coded qualitative data"],
-                        },
-                        {"typeName": "language", "value": ["English"]},
-                        {
-                            "typeName": "software",
-                            "value": [
-                                {"softwareName": {"value": "NVivo 12"}},
-                            ],
-                        },
-                        {
-                            "typeName": "geographicCoverage",
-                            "value": [
-                                {"country": {"value": "United States"}},
-                                {"country": {"value": "Canada"}},
-                            ],
-                        },
-                        {
-                            "typeName": "datasetContact",
-                            "value": [
-                                {
-                                    "datasetContactName": {"value": "Smith, J."},
-                                    "datasetContactEmail": {"value": "smith@example.edu"},
-                                },
-                            ],
-                        },
-                        {"typeName": "depositor", "value": "Doe, A."},
-                        {
-                            "typeName": "producer",
-                            "value": [
-                                {"producerName": {"value": "University of Testing"}},
-                            ],
-                        },
-                        {
-                            "typeName": "publication",
-                            "value": [
-                                {
-                                    "publicationCitation": {
-                                        "value": "Smith (2023) Qualitative Study",
-                                    },
-                                    "publicationURL": {"value": "https://doi.org/10.1234/test"},
-                                },
-                            ],
-                        },
-                        {
-                            "typeName": "dateOfCollection",
-                            "value": [
-                                {
-                                    "dateOfCollectionStart": {"value": "2022-01-01"},
-                                    "dateOfCollectionEnd": {"value": "2022-12-31"},
-                                },
-                            ],
-                        },
-                        {
-                            "typeName": "timePeriodCovered",
-                            "value": [
-                                {
-                                    "timePeriodCoveredStart": {"value": "2020-01-01"},
-                                    "timePeriodCoveredEnd": {"value": "2022-06-30"},
-                                },
-                            ],
-                        },
-                    ]
-                }
-            },
-            "files": [
-                {
-                    "restricted": False,
-                    "dataFile": {
-                        "id": 12345,
-                        "filename": "interviews.qdpx",
-                        "filesize": 204800,
-                        "contentType": "application/x-zip-refiqda",
-                        "friendlyType": "REFI-QDA-Project",
-                        "checksum": {"type": "SHA-1", "value": "abc123def456"},
-                    },
-                },
-                {
-                    "restricted": True,
-                    "dataFile": {
-                        "id": 12346,
-                        "filename": "codebook.pdf",
-                        "filesize": 51200,
-                        "contentType": "application/pdf",
-                        "friendlyType": "Adobe PDF",
-                        "checksum": {"type": "MD5", "value": "deadbeef"},
-                    },
-                },
-            ],
-        }
-    },
-}
 
+def test_search_fetches_remaining_pages_in_order(connector, respx_mock):
+    route = respx_mock.get(f"{BASE_URL}/api/search").mock(side_effect=_search_page)
 
-def test_get_metadata_with_persistent_id(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = DATASET_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
+    results = connector.search("qualitative")
 
-    url = "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123"
+    # Capped at MAX_SEARCH_RESULTS: five pages, parsed in page order
+    assert [r.title for r in results] == [f"Dataset {i}" for i in range(500)]
+    starts = sorted(int(call.request.url.params["start"]) for call in route.calls)
+    assert starts == [0, 100, 200, 300, 400]
 
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        result = connector.get_metadata(url)
-
-    assert result.title == "Interview Dataset A"
-    assert result.license_type == "CC0 1.0"
-    assert result.authors == "Smith, J.; Doe, A."
-    assert len(result.files) == 2
-    assert result.files[0]["name"] == "interviews.qdpx"
-    assert result.files[0]["id"] == 12345
-    assert "/api/access/datafile/12345" in result.files[0]["download_url"]
-
-    # New metadata fields
-    assert result.keywords == ["qualitative research", "interviews"]
-    assert result.kind_of_data == ["interview transcripts", "coded qualitative data"]
-    assert result.language == ["English"]
-    assert result.software == ["NVivo 12"]
-    assert result.geographic_coverage == ["United States", "Canada"]
-
-    # Uploader / contact info
-    assert result.uploader_name == "Smith, J."
-    assert result.uploader_email == "smith@example.edu"
-
-    # Provenance fields
-    assert result.depositor == "Doe, A."
-    assert result.producer == ["University of Testing"]
-    assert result.publication == ["Smith (2023) Qualitative Study"]
-    assert result.date_of_collection == "2022-01-01 to 2022-12-31"
-    assert result.time_period_covered == "2020-01-01 to 2022-06-30"
-
-    # File-level fields
-    assert result.files[0]["restricted"] is False
-    assert result.files[0]["friendly_type"] == "REFI-QDA-Project"
-    assert result.files[0]["content_type"] == "application/x-zip-refiqda"
-    assert result.files[0]["api_checksum"] == "SHA-1:abc123def456"
-    assert result.files[1]["restricted"] is True
-    assert result.files[1]["api_checksum"] == "MD5:deadbeef"
-
-    # Should have used persistentId endpoint
-    call_args = mock_get.call_args
-    assert ":persistentId" in call_args[0][0]
-    assert call_args[1]["params"]["persistentId"] == "doi:10.5064/F6ABC123"
-
-
-def test_get_metadata_terms_of_access_fallback(connector):
-    """When no license block exists, termsOfAccess should be used as license_type."""
-    response = {
-        "status": "OK",
-        "data": {
-            "latestVersion": {
-                "releaseTime": "2023-01-01T00:00:00Z",
-                "termsOfAccess": "QDR Standard Access",
-                "metadataBlocks": {
-                    "citation": {
-                        "fields": [
-                            {"typeName": "title", "value": "No License Dataset"},
-                        ]
-                    }
-                },
-                "files": [],
-            }
+
+# -- Get metadata --
+
+_PID_PATH = "/api/datasets/:persistentId"
+
+# (fixture file, API path, dataset URL, expected query params, expected result fields)
+METADATA_CASES = [
+    pytest.param(
+        "dataverse_dataset.json",
+        _PID_PATH,
+        "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
+        {"persistentId": "doi:10.5064/F6ABC123"},
+        {
+            "title": "Interview Dataset A",
+            "license_type": "CC0 1.0",
+            "authors": "Smith, J.; Doe, A.",
+            "keywords": ["qualitative research", "interviews"],
+            "kind_of_data": ["interview transcripts", "coded qualitative data"],
+            "language": ["English"],
+            "software": ["NVivo 12"],
+            "geographic_coverage": ["United States", "Canada"],
+            "uploader_name": "Smith, J.",
+            "uploader_email": "smith@example.edu",
+            "depositor": "Doe, A.",
+            "producer": ["University of Testing"],
+            "publication": ["Smith (2023) Qualitative Study"],
+            "date_of_collection": "2022-01-01 to 2022-12-31",
+            "time_period_covered": "2020-01-01 to 2022-06-30",
         },
-    }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
-
-    url = "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6TEST"
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(url)
-
-    assert result.license_type == "QDR Standard Access"
-
-
-def test_get_metadata_missing_optional_fields(connector):
-    """Fields like depositor, producer, etc. default to empty when absent (e.g. DANS)."""
-    response = {
-        "status": "OK",
-        "data": {
-            "latestVersion": {
-                "releaseTime": "2023-01-01T00:00:00Z",
-                "license": {"name": "DANS Licence", "uri": "https://example.com"},
-                "metadataBlocks": {
-                    "citation": {
-                        "fields": [
-                            {"typeName": "title", "value": "Minimal Dataset"},
-                            {
-                                "typeName": "datasetContact",
-                                "value": [
-                                    {"datasetContactName": {"value": "Contact Person"}},
-                                ],
-                            },
-                        ]
-                    }
-                },
-                "files": [],
-            }
+        id="persistent-id",
+    ),
+    # No license block: termsOfAccess stands in as the license
+    pytest.param(
+        "dataverse_terms_only.json",
+        _PID_PATH,
+        "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6TEST",
+        {"persistentId": "doi:10.5064/F6TEST"},
+        {"license_type": "QDR Standard Access"},
+        id="terms-of-access-fallback",
+    ),
+    # Only a title and a contact, as some installations (e.g. DANS) return
+    pytest.param(
+        "dataverse_minimal.json",
+        _PID_PATH,
+        "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/MINIMAL",
+        {"persistentId": "doi:10.5064/MINIMAL"},
+        {
+            "uploader_name": "Contact Person",
+            "uploader_email": "",
+            "depositor": "",
+            "producer": [],
+            "publication": [],
+            "date_of_collection": "",
+            "time_period_covered": "",
         },
-    }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
+        id="missing-optional-fields",
+    ),
+    # Numeric dataset IDs use the plain /api/datasets/{id} endpoint
+    pytest.param(
+        "dataverse_dataset.json",
+        "/api/datasets/42",
+        "https://data.qdr.syr.edu/dataset/42",
+        {},
+        {"title": "Interview Dataset A"},
+        id="numeric-id",
+    ),
+]
+
+
+@pytest.mark.parametrize("fixture, path, url, params, expected", METADATA_CASES)
+def test_get_metadata(connector, respx_mock, fixture, path, url, params, expected):
+    route = respx_mock.get(f"{BASE_URL}{path}").mock(
+        return_value=json_response(load_json(fixture))
+    )
+
+    result = connector.get_metadata(url)
+
+    assert {field: getattr(result, field) for field in expected} == expected
+    assert route.call_count == 1
+    assert dict(route.calls.last.request.url.params) == params
 
-    url = "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/MINIMAL"
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(url)
 
-    assert result.uploader_name == "Contact Person"
-    assert result.uploader_email == ""
-    assert result.depositor == ""
-    assert result.producer == []
-    assert result.publication == []
-    assert result.date_of_collection == ""
-    assert result.time_period_covered == ""
+EXPECTED_FILES = [
+    {
+        "name": "interviews.qdpx",
+        "id": 12345,
+        "size": 204800,
+        "download_url": f"{BASE_URL}/api/access/datafile/12345",
+        "api_checksum": "SHA-1:abc123def456",
+        "restricted": False,
+        "friendly_type": "REFI-QDA-Project",
+        "content_type": "application/x-zip-refiqda",
+    },
+    {
+        "name": "codebook.pdf",
+        "id": 12346,
+        "size": 51200,
+        "download_url": f"{BASE_URL}/api/access/datafile/12346",
+        "api_checksum": "MD5:deadbeef",
+        "restricted": True,
+        "friendly_type": "Adobe PDF",
+        "content_type": "application/pdf",
+    },
+]
 
 
-def test_get_metadata_with_numeric_id(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = DATASET_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
+def test_get_metadata_files(connector, respx_mock):
+    respx_mock.get(f"{BASE_URL}{_PID_PATH}").mock(
+        return_value=json_response(load_json("dataverse_dataset.json"))
+    )
 
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        connector.get_metadata("https://data.qdr.syr.edu/dataset/42")
+    url = "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123"
+    result = connector.get_metadata(url)
 
-    # Should have used numeric ID endpoint
-    call_args = mock_get.call_args
-    assert "/api/datasets/42" in call_args[0][0]
+    assert result.files == EXPECTED_FILES
 
 
 # -- Download --
 
+# Built once; httpx.Headers normalizes keys on every construction
+_DISPOSITION_HEADERS = httpx.Headers(
+    {"content-disposition": 'attachment; filename="test_data.qdpx"'}
+)
+_EMPTY_HEADERS = httpx.Headers({})
 
-def test_download_creates_file(connector, tmp_path):
-    content = b"fake file content for testing"
 
-    mock_response = MagicMock()
-    mock_response.headers = httpx.Headers(
-        {"content-disposition": 'attachment; filename="test_data.qdpx"'}
+def test_download_creates_file(connector, dl_dir, respx_mock):
+    content = b"fake file content for testing"
+    url = f"{BASE_URL}/api/access/datafile/12345"
+    respx_mock.get(url).mock(
+        return_value=httpx.Response(200, content=content, headers=_DISPOSITION_HEADERS)
     )
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
-
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://data.qdr.syr.edu/api/access/datafile/12345",
-            str(tmp_path),
-        )
 
-    assert path == str(tmp_path / "test_data.qdpx")
-    assert (tmp_path / "test_data.qdpx").read_bytes() == content
+    path = connector.download(url, str(dl_dir))
 
+    assert path == str(dl_dir / "test_data.qdpx")
+    assert (dl_dir / "test_data.qdpx").read_bytes() == content
 
-def test_download_fallback_filename(connector, tmp_path):
-    content = b"data"
 
-    mock_response = MagicMock()
-    mock_response.headers = httpx.Headers({})  # No Content-Disposition
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
+def test_download_fallback_filename(connector, dl_dir, respx_mock):
+    url = f"{BASE_URL}/api/access/datafile/99999"
+    respx_mock.get(url).mock(
+        return_value=httpx.Response(200, content=b"data", headers=_EMPTY_HEADERS)
+    )
 
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://data.qdr.syr.edu/api/access/datafile/99999",
-            str(tmp_path),
-        )
+    path = connector.download(url, str(dl_dir))
 
     # Falls back to using the ID from URL
-    assert path == str(tmp_path / "99999")
+    assert path == str(dl_dir / "99999")
 
 
 # -- Helpers --
 
 
-def test_extract_persistent_id():
-    url = "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123"
-    assert DataverseConnector._extract_persistent_id(url) == "doi:10.5064/F6ABC123"
-
-
-def test_extract_persistent_id_bare_doi():
-    pid = "doi:10.5064/F6ABC123"
-    assert DataverseConnector._extract_persistent_id(pid) == pid
-
-
-def test_extract_persistent_id_none():
-    assert DataverseConnector._extract_persistent_id("https://example.com/dataset/42") is None
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (
+            "https://data.qdr.syr.edu/dataset.xhtml?persistentId=doi:10.5064/F6ABC123",
+            "doi:10.5064/F6ABC123",
+        ),
+        (
+            "https://dataverse.no/dataset.xhtml?persistentId=doi:10.18710/XYZ&version=1.0",
+            "doi:10.18710/XYZ",
+        ),
+        ("doi:10.5064/F6ABC123", "doi:10.5064/F6ABC123"),
+        ("hdl:1902.1/12345", "hdl:1902.1/12345"),
+        ("https://example.com/dataset/42", None),
+        ("42", None),
+    ],
+)
+def test_extract_persistent_id(value, expected):
+    assert DataverseConnector._extract_persistent_id(value) == expected
 
 
 def test_filename_from_headers():
-    headers = httpx.Headers({"content-disposition": 'attachment; filename="data.csv"'})
-    assert _filename_from_headers(headers) == "data.csv"
+    assert _filename_from_headers(_DISPOSITION_HEADERS) == "test_data.qdpx"
 
 
 def test_filename_from_headers_missing():
-    headers = httpx.Headers({})
-    assert _filename_from_headers(headers) is None
-
-
-# -- Connector registry --
-
-
-def test_connector_registry():
-    from pipeline.connectors import CONNECTORS
+    assert _filename_from_headers(_EMPTY_HEADERS) is None
 
-    assert "qdr" in CONNECTORS
-    assert isinstance(CONNECTORS["qdr"], DataverseConnector)
-    assert "dans" in CONNECTORS
-    assert isinstance(CONNECTORS["dans"], DataverseConnector)
-    assert "dataverseno" in CONNECTORS
-    assert isinstance(CONNECTORS["dataverseno"], DataverseConnector)
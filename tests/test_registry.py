@@ -0,0 +1,25 @@
+"""Tests for the connector registry."""
+
+import pytest
+
+from pipeline.connectors import (
+    DataverseConnector,
+    DryadConnector,
+    UKDataServiceConnector,
+    ZenodoConnector,
+)
+
+
+@pytest.mark.parametrize(
+    "key, cls",
+    [
+        ("qdr", DataverseConnector),
+        ("dans", DataverseConnector),
+        ("dataverseno", DataverseConnector),
+        ("zenodo", ZenodoConnector),
+        ("ukds", UKDataServiceConnector),
+        ("dryad", DryadConnector),
+    ],
+)
+def test_connector_registry(connectors, key, cls):
+    assert isinstance(connectors[key], cls)
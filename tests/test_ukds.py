@@ -1,7 +1,8 @@
-"""Tests for the UK Data Service (ReShare) connector with mocked HTTP."""
+"""Tests for the UK Data Service (ReShare) connector over a mocked httpx transport."""
 
-from unittest.mock import MagicMock, patch
+import json
 
+import httpx
 import pytest
 
 from pipeline.connectors.base import BaseConnector
@@ -11,17 +12,64 @@ from pipeline.connectors.ukds import (
     _extract_eprint_id,
     _format_creator,
     _is_open_license,
+    _join_creators,
     _map_license,
     _pick_license,
-    _strip_html,
 )
+from tests._responses import freeze, load_json
+
+SEARCH_PATH = "/cgi/search/simple/export_reshare_JSON.js"
+
+
+def _record_path(eprint_id: int) -> str:
+    return f"/cgi/export/eprint/{eprint_id}/JSON/reshare-eprint-{eprint_id}.js"
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Mock ReShare transport with its route table (URL path -> body) and request log."""
+    routes: dict[str, bytes] = {}
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=routes[request.url.path])
+
+    return httpx.MockTransport(handler), routes, requests
+
+
+@pytest.fixture(scope="module")
+def connector(server):
+    transport, _, _ = server
+    client = httpx.Client(transport=transport)
+    yield UKDataServiceConnector(client=client)
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def _reset_state(connector, server):
+    # Connector and server are module-scoped: no throttling, cached records,
+    # routes or logged requests may carry over from the previous test.
+    connector._last_request_time = 0.0
+    connector._fetch_record.cache_clear()
+    _, routes, requests = server
+    routes.clear()
+    requests.clear()
 
 
 @pytest.fixture
-def connector():
-    c = UKDataServiceConnector()
-    c._last_request_time = 0.0
-    return c
+def serve(server):
+    """Return serve(path, body) to register a route; it returns the requests seen."""
+    _, routes, requests = server
+
+    def serve(path: str, body) -> list[httpx.Request]:
+        # body is raw bytes or a JSON payload
+        if not isinstance(body, bytes):
+            body = json.dumps(body, default=dict).encode()
+        routes[path] = body
+        return requests
+
+    return serve
 
 
 # -- Interface compliance --
@@ -37,7 +85,7 @@ def test_name_property(connector):
 
 # -- Search --
 
-SEARCH_RESPONSE = [
+SEARCH_RESPONSE = freeze([
     {
         "eprintid": 857166,
         "title": "Transcript Qualitative Interview Data",
@@ -66,16 +114,12 @@ SEARCH_RESPONSE = [
         "keywords": ["PEDAGOGY"],
         "documents": [],
     },
-]
+])
 
 
-def test_search_parses_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        results = connector.search("qualitative interview")
+def test_search_parses_results(connector, serve):
+    requests = serve(SEARCH_PATH, SEARCH_RESPONSE)
+    results = connector.search("qualitative interview")
 
     assert len(results) == 2
     assert results[0].title == "Transcript Qualitative Interview Data"
@@ -87,29 +131,20 @@ def test_search_parses_results(connector):
     assert results[0].keywords == ["CRIMINAL JUSTICE", "SOCIAL POLICY"]
     assert results[1].title == "Focus Group Transcripts"
 
-    mock_get.assert_called_once()
-    call_args = mock_get.call_args
-    assert "export_reshare_JSON" in call_args[0][0]
-
+    assert len(requests) == 1
+    assert requests[0].url.params["q"] == "qualitative interview"
 
-def test_search_empty_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = []
-    mock_resp.raise_for_status = MagicMock()
 
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("nonexistent")
+def test_search_empty_results(connector, serve):
+    serve(SEARCH_PATH, [])
+    results = connector.search("nonexistent")
 
     assert results == []
 
 
-def test_search_file_type_filtering(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("qualitative", file_type="zip")
+def test_search_file_type_filtering(connector, serve):
+    serve(SEARCH_PATH, SEARCH_RESPONSE)
+    results = connector.search("qualitative", file_type="zip")
 
     # Only first record has a .zip file
     assert len(results) == 1
@@ -118,183 +153,113 @@ def test_search_file_type_filtering(connector):
 
 # -- Get metadata --
 
-RECORD_RESPONSE = {
-    "eprintid": 857166,
+RECORD_RESPONSE = load_json("ukds_record.json")
+
+
+# Fields checked on the parsed full record, compared in one structural assert
+EXPECTED_RECORD = {
     "title": "Transcript Qualitative Interview Data",
-    "abstract": "A <b>qualitative</b> study of prison residents.",
-    "creators": [
-        {
-            "name": {"given": "Thomas", "family": "Wells"},
-            "id": "thomas@example.com",
-        },
-        {"name": {"given": "Jane", "family": "Doe"}},
-    ],
-    "date": "2024-09-02",
-    "doi": "10.5255/UKDA-SN-857166",
+    "source_name": "ukds",
+    "source_url": "https://reshare.ukdataservice.ac.uk/857166/",
+    "authors": "Thomas Wells; Jane Doe",
+    "license_type": "CC-BY-NC-SA-4.0",
+    "license_url": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
+    "date_published": "2024-09-02",
+    # HTML stripped
+    "description": "A qualitative study of prison residents.",
     "keywords": ["CRIMINAL JUSTICE", "SOCIAL POLICY"],
     "language": ["English"],
-    "data_kind": ["Text"],
-    "country": ["United Kingdom"],
-    "geographic_cover": "Northern England",
-    "award_funders": ["ESRC"],
-    "contact_details": [
-        {"name": {"given": "Thomas", "family": "Wells"}},
-    ],
-    "collection_dates": {
-        "date_from": "2022-08-03",
-        "date_to": "2022-09-29",
-    },
-    "documents": [
+    "kind_of_data": ["Text"],
+    "geographic_coverage": ["United Kingdom", "Northern England"],
+    "producer": ["ESRC"],
+    "publication": ["https://doi.org/10.5255/UKDA-SN-857166"],
+    "uploader_name": "Thomas Wells",
+    "uploader_email": "thomas@example.com",
+    "depositor": "Thomas Wells",
+    "date_of_collection": "2022-08-03 to 2022-09-29",
+    "software": [],
+    "time_period_covered": "",
+    # 3 real files (thumbnails/index filtered out)
+    "files": [
         {
-            "uri": "http://reshare.ukdataservice.ac.uk/id/document/3760839",
-            "placement": 1,
-            "license": "cc_by_nc_sa",
-            "security": "public",
-            "files": [
-                {
-                    "filename": "857166_documentation.zip",
-                    "filesize": 132076,
-                    "mime_type": "application/zip",
-                },
-            ],
+            "name": "857166_documentation.zip",
+            "id": "857166",
+            "size": 132076,
+            "download_url": "https://reshare.ukdataservice.ac.uk/id/document/3760839",
+            "api_checksum": "",
+            "restricted": False,
+            "friendly_type": "zip",
+            "content_type": "application/zip",
         },
+        # Restricted: staffonly + non-open license
         {
-            "uri": "http://reshare.ukdataservice.ac.uk/id/document/3760840",
-            "placement": 2,
-            "license": "ukda_eul",
-            "security": "staffonly",
-            "files": [
-                {
-                    "filename": "857166_data.zip",
-                    "filesize": 1588674,
-                    "mime_type": "application/zip",
-                },
-            ],
+            "name": "857166_data.zip",
+            "id": "857166",
+            "size": 1588674,
+            "download_url": "https://reshare.ukdataservice.ac.uk/id/document/3760840",
+            "api_checksum": "",
+            "restricted": True,
+            "friendly_type": "zip",
+            "content_type": "application/zip",
         },
         {
-            "uri": "http://reshare.ukdataservice.ac.uk/id/document/3760841",
-            "placement": 3,
-            "license": "cc_by_sa",
-            "security": "public",
-            "files": [
-                {
-                    "filename": "857166_readme.docx",
-                    "filesize": 42489,
-                    "mime_type": (
-                        "application/vnd.openxmlformats"
-                        "-officedocument.wordprocessingml.document"
-                    ),
-                },
-            ],
-        },
-        {
-            "uri": "http://reshare.ukdataservice.ac.uk/id/document/3760842",
-            "placement": 10,
-            "license": "cc_public_domain",
-            "security": "public",
-            "files": [
-                {"filename": "lightbox.jpg", "filesize": 806, "mime_type": "image/png"},
-                {"filename": "indexcodes.txt", "filesize": 350, "mime_type": "text/plain"},
-            ],
+            "name": "857166_readme.docx",
+            "id": "857166",
+            "size": 42489,
+            "download_url": "https://reshare.ukdataservice.ac.uk/id/document/3760841",
+            "api_checksum": "",
+            "restricted": False,
+            "friendly_type": "docx",
+            "content_type": (
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            ),
         },
     ],
 }
 
 
-def test_get_metadata_full(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = RECORD_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
+def test_get_metadata_full(connector, serve):
+    serve(_record_path(857166), RECORD_RESPONSE)
+    result = connector.get_metadata("https://reshare.ukdataservice.ac.uk/857166/")
 
-    url = "https://reshare.ukdataservice.ac.uk/857166/"
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(url)
+    assert {field: getattr(result, field) for field in EXPECTED_RECORD} == EXPECTED_RECORD
 
-    # Basic fields
-    assert result.title == "Transcript Qualitative Interview Data"
-    assert result.source_name == "ukds"
-    assert result.source_url == url
-    assert result.authors == "Thomas Wells; Jane Doe"
-    assert result.license_type == "CC-BY-NC-SA-4.0"
-    assert "creativecommons.org" in result.license_url
-    assert result.date_published == "2024-09-02"
 
-    # HTML stripped
-    assert "<b>" not in result.description
-    assert "qualitative" in result.description
-
-    # Extended metadata
-    assert result.keywords == ["CRIMINAL JUSTICE", "SOCIAL POLICY"]
-    assert result.language == ["English"]
-    assert result.kind_of_data == ["Text"]
-    assert "United Kingdom" in result.geographic_coverage
-    assert "Northern England" in result.geographic_coverage
-    assert result.producer == ["ESRC"]
-    assert "10.5255/UKDA-SN-857166" in result.publication[0]
-    assert result.uploader_name == "Thomas Wells"
-    assert result.uploader_email == "thomas@example.com"
-    assert result.depositor == "Thomas Wells"
-    assert result.date_of_collection == "2022-08-03 to 2022-09-29"
-
-    # Empty fields
-    assert result.software == []
-    assert result.time_period_covered == ""
-
-    # Files — 3 real files (thumbnails/index filtered out)
-    assert len(result.files) == 3
-
-    # Public file
-    f0 = result.files[0]
-    assert f0["name"] == "857166_documentation.zip"
-    assert f0["id"] == "857166"
-    assert f0["restricted"] is False
-    assert f0["download_url"] == (
-        "https://reshare.ukdataservice.ac.uk/id/document/3760839"
+def test_get_metadata_list_response(connector, serve):
+    """Single record endpoint may return a list."""
+    serve(_record_path(857166), [RECORD_RESPONSE])
+    result = connector.get_metadata(
+        "https://reshare.ukdataservice.ac.uk/857166/"
     )
-    assert f0["content_type"] == "application/zip"
-    assert f0["friendly_type"] == "zip"
 
-    # Restricted file (staffonly + non-open license)
-    f1 = result.files[1]
-    assert f1["name"] == "857166_data.zip"
-    assert f1["restricted"] is True
+    assert result.title == "Transcript Qualitative Interview Data"
 
-    # Another public file
-    f2 = result.files[2]
-    assert f2["name"] == "857166_readme.docx"
-    assert f2["restricted"] is False
 
+def test_get_metadata_reuses_fetched_record(connector, serve):
+    requests = serve(_record_path(857166), RECORD_RESPONSE)
+    first = connector.get_metadata("https://reshare.ukdataservice.ac.uk/857166/")
+    first.keywords.append("mutated")
+    second = connector.get_metadata("https://reshare.ukdataservice.ac.uk/id/eprint/857166")
 
-def test_get_metadata_list_response(connector):
-    """Single record endpoint may return a list."""
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = [RECORD_RESPONSE]
-    mock_resp.raise_for_status = MagicMock()
+    # Both URL forms hit one cache entry, and each call gets its own decoded copy
+    assert len(requests) == 1
+    assert second.keywords == EXPECTED_RECORD["keywords"]
 
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(
-            "https://reshare.ukdataservice.ac.uk/857166/"
-        )
 
-    assert result.title == "Transcript Qualitative Interview Data"
+MINIMAL_RECORD = freeze({
+    "eprintid": 99999,
+    "title": "Minimal Record",
+    "creators": [{"name": {"given": "Author", "family": "One"}}],
+    "date": "2024-01-01",
+    "documents": [],
+})
 
 
-def test_get_metadata_missing_optional_fields(connector):
-    response = {
-        "eprintid": 99999,
-        "title": "Minimal Record",
-        "creators": [{"name": {"given": "Author", "family": "One"}}],
-        "date": "2024-01-01",
-        "documents": [],
-    }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(
-            "https://reshare.ukdataservice.ac.uk/99999/"
-        )
+def test_get_metadata_missing_optional_fields(connector, serve):
+    serve(_record_path(99999), MINIMAL_RECORD)
+    result = connector.get_metadata(
+        "https://reshare.ukdataservice.ac.uk/99999/"
+    )
 
     assert result.title == "Minimal Record"
     assert result.description == ""
@@ -309,23 +274,21 @@ def test_get_metadata_missing_optional_fields(connector):
     assert result.files == []
 
 
-def test_get_metadata_html_stripping(connector):
-    response = {
-        "eprintid": 11111,
-        "title": "HTML Test",
-        "abstract": "<p>This is <strong>bold</strong> and <em>italic</em>.</p>",
-        "creators": [],
-        "date": "2024-01-01",
-        "documents": [],
-    }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
+HTML_RECORD = freeze({
+    "eprintid": 11111,
+    "title": "HTML Test",
+    "abstract": "<p>This is <strong>bold</strong> and <em>italic</em>.</p>",
+    "creators": [],
+    "date": "2024-01-01",
+    "documents": [],
+})
 
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata(
-            "https://reshare.ukdataservice.ac.uk/11111/"
-        )
+
+def test_get_metadata_html_stripping(connector, serve):
+    serve(_record_path(11111), HTML_RECORD)
+    result = connector.get_metadata(
+        "https://reshare.ukdataservice.ac.uk/11111/"
+    )
 
     assert result.description == "This is bold and italic ."
     assert "<" not in result.description
@@ -333,115 +296,99 @@ def test_get_metadata_html_stripping(connector):
 
 # -- Download --
 
+# A short body, and one spanning several 8 KiB iter_bytes() chunks
+@pytest.mark.parametrize(
+    "content", [b"fake reshare file content", bytes(range(256)) * 257], ids=["small", "chunked"]
+)
+def test_download_creates_file(connector, dl_dir, serve, content):
+    serve("/857166/1/857166_documentation.zip", content)
+    path = connector.download(
+        "https://reshare.ukdataservice.ac.uk/857166/1/857166_documentation.zip",
+        str(dl_dir),
+    )
 
-def test_download_creates_file(connector, tmp_path):
-    content = b"fake reshare file content"
-
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
-
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://reshare.ukdataservice.ac.uk/857166/1/857166_documentation.zip",
-            str(tmp_path),
-        )
-
-    assert path == str(tmp_path / "857166_documentation.zip")
-    assert (tmp_path / "857166_documentation.zip").read_bytes() == content
+    assert path == str(dl_dir / "857166_documentation.zip")
+    assert (dl_dir / "857166_documentation.zip").read_bytes() == content
 
 
-def test_download_explicit_filename(connector, tmp_path):
+def test_download_explicit_filename(connector, dl_dir, serve):
     content = b"data"
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
-
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://reshare.ukdataservice.ac.uk/857166/1/857166_documentation.zip",
-            str(tmp_path),
-            filename="custom.zip",
-        )
+    serve("/857166/1/857166_documentation.zip", content)
+    path = connector.download(
+        "https://reshare.ukdataservice.ac.uk/857166/1/857166_documentation.zip",
+        str(dl_dir),
+        filename="custom.zip",
+    )
 
-    assert path == str(tmp_path / "custom.zip")
+    assert path == str(dl_dir / "custom.zip")
 
 
 # -- Helpers --
 
 
-def test_extract_eprint_id_from_url():
-    url = "https://reshare.ukdataservice.ac.uk/857166/"
-    assert _extract_eprint_id(url) == "857166"
-
-
-def test_extract_eprint_id_from_eprint_url():
-    url = "https://reshare.ukdataservice.ac.uk/id/eprint/857166"
-    assert _extract_eprint_id(url) == "857166"
-
-
-def test_extract_eprint_id_bare_number():
-    assert _extract_eprint_id("857166") == "857166"
-
-
-def test_extract_doc_id():
-    uri = "http://reshare.ukdataservice.ac.uk/id/document/3744469"
-    assert _extract_doc_id(uri) == "3744469"
-
-
-def test_extract_doc_id_empty():
-    assert _extract_doc_id("") == ""
-
-
-def test_format_creator():
-    c = {"name": {"given": "Thomas", "family": "Wells"}}
-    assert _format_creator(c) == "Thomas Wells"
-
-
-def test_format_creator_missing_given():
-    c = {"name": {"given": None, "family": "Wells"}}
-    assert _format_creator(c) == "Wells"
-
-
-def test_is_open_license():
-    assert _is_open_license("cc_by") is True
-    assert _is_open_license("cc_by_sa") is True
-    assert _is_open_license("cc_public_domain") is True
-    assert _is_open_license("ukda_eul") is False
-    assert _is_open_license("unknown") is False
-
-
-def test_map_license():
-    assert _map_license("cc_by") == "CC-BY-4.0"
-    assert _map_license("cc_by_nc_sa") == "CC-BY-NC-SA-4.0"
-    assert _map_license("cc_public_domain") == "CC0-1.0"
-    assert _map_license("ukda_eul") == "ukda_eul"
-
-
-def test_pick_license_prefers_open():
-    assert _pick_license(["ukda_eul", "cc_by_sa"]) == "CC-BY-SA-4.0"
-
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://reshare.ukdataservice.ac.uk/857166/", "857166"),
+        ("https://reshare.ukdataservice.ac.uk/id/eprint/857166", "857166"),
+        ("857166", "857166"),
+        # Regex fallback: the eprint segment is followed by more path
+        ("https://reshare.ukdataservice.ac.uk/id/eprint/857166/1/data.zip", "857166"),
+    ],
+)
+def test_extract_eprint_id(url, expected):
+    assert _extract_eprint_id(url) == expected
 
-def test_pick_license_empty():
-    assert _pick_license([]) == ""
 
+@pytest.mark.parametrize(
+    "uri, expected",
+    [
+        ("http://reshare.ukdataservice.ac.uk/id/document/3744469", "3744469"),
+        ("http://reshare.ukdataservice.ac.uk/id/document/3744469/preview", "3744469"),
+        ("", ""),
+    ],
+)
+def test_extract_doc_id(uri, expected):
+    assert _extract_doc_id(uri) == expected
 
-def test_strip_html():
-    assert _strip_html("<p>Hello <b>world</b></p>") == "Hello world"
-    assert _strip_html("no tags") == "no tags"
-    assert _strip_html("") == ""
 
+@pytest.mark.parametrize("given, expected", [("Thomas", "Thomas Wells"), (None, "Wells")])
+def test_format_creator(given, expected):
+    assert _format_creator({"name": {"given": given, "family": "Wells"}}) == expected
 
-# -- Connector registry --
 
+def test_join_creators_skips_empty_names():
+    creators = [
+        {"name": {"given": "Thomas", "family": "Wells"}},
+        {"name": None},
+        {"name": {"given": "Jane", "family": "Doe"}},
+    ]
+    assert _join_creators(creators) == "Thomas Wells; Jane Doe"
+
+
+@pytest.mark.parametrize(
+    "license_str, is_open, mapped",
+    [
+        ("cc_by", True, "CC-BY-4.0"),
+        ("cc_by_sa", True, "CC-BY-SA-4.0"),
+        ("cc_by_nc_sa", True, "CC-BY-NC-SA-4.0"),
+        ("cc_public_domain", True, "CC0-1.0"),
+        ("ukda_eul", False, "ukda_eul"),
+        ("unknown", False, "unknown"),
+    ],
+)
+def test_license_helpers(license_str, is_open, mapped):
+    assert _is_open_license(license_str) is is_open
+    assert _map_license(license_str) == mapped
 
-def test_connector_registry():
-    from pipeline.connectors import CONNECTORS
 
-    assert "ukds" in CONNECTORS
-    assert isinstance(CONNECTORS["ukds"], UKDataServiceConnector)
+@pytest.mark.parametrize(
+    "licenses, expected",
+    [
+        (["ukda_eul", "cc_by_sa"], "CC-BY-SA-4.0"),  # open license preferred
+        ([], ""),
+    ],
+)
+def test_pick_license(licenses, expected):
+    assert _pick_license(licenses) == expected
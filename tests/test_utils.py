@@ -1,31 +1,70 @@
 """Tests for utility functions."""
 
-from pipeline.connectors.dataverse import _strip_html
+import re
+import time
+
+import pytest
+
+from pipeline.utils import text as text_utils
 from pipeline.utils.license import is_open_license
+from pipeline.utils.text import strip_html
 
 
 def test_strip_html_basic():
-    assert _strip_html("<p>Hello <b>world</b></p>") == "Hello world"
+    assert strip_html("<p>Hello <b>world</b></p>") == "Hello world"
 
 
 def test_strip_html_nested():
     raw = "<h3>Overview</h3><p>Some <em>qualitative</em> data.</p>"
-    assert _strip_html(raw) == "Overview Some qualitative data."
+    assert strip_html(raw) == "Overview Some qualitative data."
 
 
 def test_strip_html_whitespace():
     raw = "<p>\n  Multiple\n  lines\n</p>"
-    result = _strip_html(raw)
+    result = strip_html(raw)
     assert "  " not in result  # no double spaces
     assert "\n" not in result
 
 
 def test_strip_html_empty():
-    assert _strip_html("") == ""
+    assert strip_html("") == ""
 
 
 def test_strip_html_no_tags():
-    assert _strip_html("plain text") == "plain text"
+    assert strip_html("plain text") == "plain text"
+
+
+def test_strip_html_unclosed():
+    # Unclosed "<" runs are left alone (and must not backtrack quadratically)
+    assert strip_html("<" * 100_000) == "<" * 100_000
+
+
+def test_strip_html_unescape():
+    raw = "<p>Tom&nbsp;&amp;\u200b Jerry\ufeff</p>"
+    assert strip_html(raw) == "Tom&nbsp;&amp; Jerry"
+    assert strip_html(raw, unescape=True) == "Tom & Jerry"
+
+
+def test_strip_html_patterns_are_precompiled():
+    assert isinstance(text_utils._TAG_RE, re.Pattern)
+    assert isinstance(text_utils._WS_RE, re.Pattern)
+
+
+# ~1 MB inputs; the budget is far above the expected few ms and only catches
+# super-linear behaviour (e.g. regex backtracking on unclosed tags).
+@pytest.mark.parametrize(
+    "text",
+    [
+        "<p>" * 350_000,
+        "<b>qualitative</b> interview " * 35_000,
+        "<" * 1_000_000,
+    ],
+    ids=["tags", "mixed", "unclosed"],
+)
+def test_strip_html_scales_linearly(text):
+    start = time.perf_counter()
+    strip_html(text)
+    assert time.perf_counter() - start < 1.0
 
 
 def test_standard_access_license():
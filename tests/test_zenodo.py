@@ -1,19 +1,52 @@
 """Tests for the Zenodo connector with mocked HTTP responses."""
 
-from unittest.mock import MagicMock, patch
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+import httpx
 import pytest
 
 from pipeline.connectors.base import BaseConnector
-from pipeline.connectors.zenodo import ZenodoConnector, _extract_record_id, _strip_html
+from pipeline.connectors.zenodo import (
+    MAX_RETRY_AFTER,
+    ZenodoConnector,
+    _extract_record_id,
+    _file_extension,
+    _join_creators,
+    _RateLimiter,
+)
+from tests._responses import freeze, json_response, load_json
 
+API = ZenodoConnector.BASE_URL
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def connector():
-    c = ZenodoConnector()
-    # Disable throttling in tests
-    c._last_request_time = 0.0
-    return c
+    # Own client, so tests never build (or leave state in) the shared pooled one
+    client = httpx.Client()
+    yield ZenodoConnector(client=client)
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def _no_throttle(monkeypatch):
+    # Disable throttling in tests; monkeypatch restores the interval afterwards
+    monkeypatch.setattr("pipeline.connectors.zenodo.MIN_REQUEST_INTERVAL", 0.0)
+
+
+@pytest.fixture(autouse=True)
+def _empty_caches(connector, monkeypatch):
+    # Tests reuse queries and record IDs with different mocked payloads
+    monkeypatch.setattr(connector, "_searches", {})
+    monkeypatch.setattr(connector, "_records", {})
+
+
+def _record_sleeps(monkeypatch) -> list[float]:
+    """Replace time.sleep with a recorder; returns the requested delays."""
+    sleeps: list[float] = []
+    monkeypatch.setattr("pipeline.connectors.zenodo.time.sleep", sleeps.append)
+    return sleeps
 
 
 # -- Interface compliance --
@@ -29,7 +62,7 @@ def test_name_property(connector):
 
 # -- Search --
 
-SEARCH_RESPONSE = {
+SEARCH_RESPONSE = freeze({
     "hits": {
         "total": 2,
         "hits": [
@@ -65,16 +98,12 @@ SEARCH_RESPONSE = {
             },
         ],
     }
-}
-
+})
 
-def test_search_parses_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
 
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        results = connector.search("qualitative interviews")
+def test_search_parses_results(connector, respx_mock):
+    route = respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+    results = connector.search("qualitative interviews")
 
     assert len(results) == 2
     assert results[0].title == "Qualitative Interview Study"
@@ -85,162 +114,221 @@ def test_search_parses_results(connector):
     assert results[0].keywords == ["qualitative", "interviews"]
     assert results[1].title == "Focus Group Transcripts"
 
-    mock_get.assert_called_once()
-    call_args = mock_get.call_args
-    assert "/api/records" in call_args[0][0]
-    assert call_args[1]["params"]["q"] == "qualitative interviews"
+    assert route.call_count == 1
+    assert route.calls.last.request.url.params["q"] == "qualitative interviews"
 
 
-def test_search_empty_results(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = {"hits": {"total": 0, "hits": []}}
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("nonexistent")
+def test_search_empty_results(connector, respx_mock):
+    respx_mock.get(f"{API}/records").mock(
+        return_value=json_response({"hits": {"total": 0, "hits": []}})
+    )
+    results = connector.search("nonexistent")
 
     assert results == []
 
 
-def test_search_file_type_filtering(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("qualitative", file_type="qdpx")
+def test_search_file_type_filtering(connector, respx_mock):
+    respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+    results = connector.search("qualitative", file_type="qdpx")
 
     # Only the first record has a .qdpx file
     assert len(results) == 1
     assert results[0].title == "Qualitative Interview Study"
 
 
-def test_search_file_type_filtering_with_dot(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = SEARCH_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        results = connector.search("qualitative", file_type=".docx")
+def test_search_file_type_filtering_with_dot(connector, respx_mock):
+    respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+    results = connector.search("qualitative", file_type=".docx")
 
     assert len(results) == 1
     assert results[0].title == "Focus Group Transcripts"
 
 
+def test_search_multiple_file_types(connector, respx_mock):
+    respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+    results = connector.search("qualitative", file_type=[".QDPX", "docx"])
+
+    # Matching is per extension and case-insensitive
+    assert [r.title for r in results] == [
+        "Qualitative Interview Study",
+        "Focus Group Transcripts",
+    ]
+
+
+def test_search_consumes_file_type_iterator_once(connector, respx_mock):
+    route = respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+
+    results = connector.search("qualitative", file_type=iter(["qdpx"]))
+    cached = connector.search("qualitative", file_type=["qdpx"])
+
+    # A one-shot iterator still filters, and the cached entry holds the filtered hits
+    assert [r.title for r in results] == ["Qualitative Interview Study"]
+    assert [r.title for r in cached] == ["Qualitative Interview Study"]
+    assert route.call_count == 1
+
+
+def _hit(i: int) -> dict:
+    return {"id": i, "metadata": {"title": f"Item {i}"}, "files": []}
+
+
+# 3 hits over two pages of 2 (PAGE_SIZE is patched down in the test)
+PAGE1 = freeze({"hits": {"total": 3, "hits": [_hit(0), _hit(1)]}})
+PAGE2 = freeze({"hits": {"total": 3, "hits": [_hit(2)]}})
+
+
+def test_search_pagination(connector, monkeypatch, respx_mock):
+    monkeypatch.setattr("pipeline.connectors.zenodo.PAGE_SIZE", 2)
+    route = respx_mock.get(f"{API}/records").mock(
+        side_effect=[json_response(PAGE1), json_response(PAGE2)]
+    )
+    results = connector.search("qualitative")
+
+    assert [r.title for r in results] == ["Item 0", "Item 1", "Item 2"]
+    params = [call.request.url.params for call in route.calls]
+    assert [p["page"] for p in params] == ["1", "2"]
+    assert params[0]["size"] == "2"
+
+
+def test_search_reuses_cached_results(connector, respx_mock):
+    route = respx_mock.get(f"{API}/records").mock(return_value=json_response(SEARCH_RESPONSE))
+
+    first = connector.search("qualitative  interviews", file_type="qdpx")
+    first[0].keywords.append("mutated")
+    second = connector.search(" qualitative interviews", file_type=".qdpx")
+
+    # Whitespace and the leading dot are normalized; each call gets its own copies
+    assert route.call_count == 1
+    assert second[0].keywords == ["qualitative", "interviews"]
+
+    connector.search("qualitative interviews", file_type="qdpx", refresh=True)
+    assert route.call_count == 2
+
+
+def test_isearch_yields_before_fetching_next_page(connector, monkeypatch, respx_mock):
+    monkeypatch.setattr("pipeline.connectors.zenodo.PAGE_SIZE", 2)
+    route = respx_mock.get(f"{API}/records").mock(
+        side_effect=[json_response(PAGE1), json_response(PAGE2)]
+    )
+    results = connector.isearch("qualitative")
+
+    assert next(results).title == "Item 0"
+    assert route.call_count == 1
+    assert [r.title for r in results] == ["Item 1", "Item 2"]
+    assert route.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "first, low, high",
+    [
+        # Retry-After wins over the backoff
+        (httpx.Response(429, headers={"Retry-After": "3"}), 3.0, 3.0),
+        # Jittered first backoff: between half and all of RETRY_DELAY
+        (httpx.Response(503), 1.0, 2.0),
+    ],
+    ids=["retry-after", "backoff"],
+)
+def test_search_retries_throttled_and_gateway_errors(
+    connector, monkeypatch, respx_mock, first, low, high
+):
+    sleeps = _record_sleeps(monkeypatch)
+    route = respx_mock.get(f"{API}/records").mock(
+        side_effect=[first, json_response(SEARCH_RESPONSE)]
+    )
+
+    results = connector.search("qualitative")
+
+    assert len(results) == 2
+    assert route.call_count == 2
+    assert len(sleeps) == 1
+    assert low <= sleeps[0] <= high
+
+
+def test_search_gives_up_after_max_retries(connector, monkeypatch, respx_mock):
+    _record_sleeps(monkeypatch)
+    route = respx_mock.get(f"{API}/records").mock(return_value=httpx.Response(502))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        connector.search("qualitative")
+    assert route.call_count == 3  # MAX_RETRIES
+
+
 # -- Get metadata --
 
-RECORD_RESPONSE = {
-    "id": 12345,
-    "metadata": {
-        "title": "Qualitative Interview Study",
-        "description": "A set of <b>qualitative</b> interviews about <i>health</i>.",
-        "creators": [
-            {"name": "Smith, J."},
-            {"name": "Doe, A."},
-        ],
-        "license": {"id": "cc-by-4.0"},
-        "publication_date": "2023-06-15",
-        "keywords": ["qualitative research", "interviews"],
-        "language": "eng",
-        "resource_type": {"type": "dataset"},
-        "contributors": [
-            {"name": "University of Testing"},
-        ],
-        "related_identifiers": [
-            {"identifier": "10.1234/test", "relation": "isSupplementTo"},
-        ],
-        "access_right": "open",
-    },
+RECORD_RESPONSE = load_json("zenodo_record.json")
+
+
+# Fields checked on the parsed full record, compared in one structural assert
+EXPECTED_RECORD = {
+    "title": "Qualitative Interview Study",
+    "source_name": "zenodo",
+    "source_url": "https://zenodo.org/records/12345",
+    "authors": "Smith, J.; Doe, A.",
+    "license_type": "cc-by-4.0",
+    "date_published": "2023-06-15",
+    # HTML stripped from description
+    "description": "A set of qualitative interviews about health .",
+    "keywords": ["qualitative research", "interviews"],
+    "tags": ["qualitative research", "interviews"],
+    "language": ["eng"],
+    "kind_of_data": ["dataset"],
+    "producer": ["University of Testing"],
+    "publication": ["isSupplementTo: 10.1234/test"],
+    "uploader_name": "Smith, J.",
+    "uploader_email": "",
+    # Not available in Zenodo
+    "software": [],
+    "geographic_coverage": [],
+    "depositor": "",
     "files": [
         {
-            "id": "a1b2c3d4-uuid",
-            "key": "interviews.qdpx",
+            "name": "interviews.qdpx",
+            "id": "12345",
             "size": 204800,
-            "checksum": "md5:abc123def456",
-            "links": {"self": "https://zenodo.org/api/records/12345/files/interviews.qdpx/content"},
+            "download_url": "https://zenodo.org/api/records/12345/files/interviews.qdpx/content",
+            "api_checksum": "md5:abc123def456",
+            "restricted": False,
+            "friendly_type": "qdpx",  # derived from extension
+            "content_type": "",
         },
         {
-            "id": "e5f6g7h8-uuid",
-            "key": "codebook.pdf",
+            "name": "codebook.pdf",
+            "id": "12345",
             "size": 51200,
-            "checksum": "md5:deadbeef",
-            "links": {"self": "https://zenodo.org/api/records/12345/files/codebook.pdf/content"},
+            "download_url": "https://zenodo.org/api/records/12345/files/codebook.pdf/content",
+            "api_checksum": "md5:deadbeef",
+            "restricted": False,
+            "friendly_type": "pdf",
+            "content_type": "",
         },
     ],
 }
 
 
-def test_get_metadata_full(connector):
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = RECORD_RESPONSE
-    mock_resp.raise_for_status = MagicMock()
+def test_get_metadata_full(connector, respx_mock):
+    route = respx_mock.get(f"{API}/records/12345").mock(
+        return_value=json_response(RECORD_RESPONSE)
+    )
+    result = connector.get_metadata("https://zenodo.org/records/12345")
 
-    url = "https://zenodo.org/records/12345"
-    with patch("httpx.get", return_value=mock_resp) as mock_get:
-        result = connector.get_metadata(url)
+    assert {field: getattr(result, field) for field in EXPECTED_RECORD} == EXPECTED_RECORD
+    assert route.call_count == 1
 
-    # Basic fields
-    assert result.title == "Qualitative Interview Study"
-    assert result.source_name == "zenodo"
-    assert result.source_url == url
-    assert result.authors == "Smith, J.; Doe, A."
-    assert result.license_type == "cc-by-4.0"
-    assert result.date_published == "2023-06-15"
 
-    # HTML stripped from description
-    assert "<b>" not in result.description
-    assert "qualitative" in result.description
-
-    # Extended metadata
-    assert result.keywords == ["qualitative research", "interviews"]
-    assert result.tags == ["qualitative research", "interviews"]
-    assert result.language == ["eng"]
-    assert result.kind_of_data == ["dataset"]
-    assert result.producer == ["University of Testing"]
-    assert result.publication == ["isSupplementTo: 10.1234/test"]
-    assert result.uploader_name == "Smith, J."
-    assert result.uploader_email == ""
-
-    # Empty fields (not available in Zenodo)
-    assert result.software == []
-    assert result.geographic_coverage == []
-    assert result.depositor == ""
-
-    # Files
-    assert len(result.files) == 2
-    assert result.files[0]["name"] == "interviews.qdpx"
-    assert result.files[0]["id"] == "12345"
-    assert result.files[0]["size"] == 204800
-    assert result.files[0]["download_url"] == "https://zenodo.org/api/records/12345/files/interviews.qdpx/content"
-    assert result.files[0]["api_checksum"] == "md5:abc123def456"
-    assert result.files[0]["restricted"] is False
-    assert result.files[0]["friendly_type"] == "qdpx"  # derived from extension
-    assert result.files[0]["content_type"] == ""
-    assert result.files[1]["name"] == "codebook.pdf"
-    assert result.files[1]["friendly_type"] == "pdf"  # derived from extension
-
-    # Correct API endpoint
-    call_args = mock_get.call_args
-    assert "/api/records/12345" in call_args[0][0]
-
-
-def test_get_metadata_restricted_record(connector):
+def test_get_metadata_restricted_record(connector, respx_mock):
     """When access_right is not 'open', all files should be marked restricted."""
-    response = dict(RECORD_RESPONSE)
-    response = {**RECORD_RESPONSE}
-    response["metadata"] = {**RECORD_RESPONSE["metadata"], "access_right": "restricted"}
-
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
+    # One literal: only the metadata subtree differs from the frozen fixture
+    response = {
+        **RECORD_RESPONSE,
+        "metadata": {**RECORD_RESPONSE["metadata"], "access_right": "restricted"},
+    }
 
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata("https://zenodo.org/records/12345")
+    respx_mock.get(f"{API}/records/12345").mock(return_value=json_response(response))
+    result = connector.get_metadata("https://zenodo.org/records/12345")
 
     assert all(f["restricted"] is True for f in result.files)
 
 
-def test_get_metadata_missing_optional_fields(connector):
+def test_get_metadata_missing_optional_fields(connector, respx_mock):
     """Optional fields default to empty when absent."""
     response = {
         "id": 99999,
@@ -251,12 +339,8 @@ def test_get_metadata_missing_optional_fields(connector):
         },
         "files": [],
     }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata("https://zenodo.org/records/99999")
+    respx_mock.get(f"{API}/records/99999").mock(return_value=json_response(response))
+    result = connector.get_metadata("https://zenodo.org/records/99999")
 
     assert result.title == "Minimal Record"
     assert result.description == ""
@@ -270,7 +354,7 @@ def test_get_metadata_missing_optional_fields(connector):
     assert result.files == []
 
 
-def test_get_metadata_html_stripping(connector):
+def test_get_metadata_html_stripping(connector, respx_mock):
     response = {
         "id": 11111,
         "metadata": {
@@ -281,85 +365,215 @@ def test_get_metadata_html_stripping(connector):
         },
         "files": [],
     }
-    mock_resp = MagicMock()
-    mock_resp.json.return_value = response
-    mock_resp.raise_for_status = MagicMock()
-
-    with patch("httpx.get", return_value=mock_resp):
-        result = connector.get_metadata("https://zenodo.org/records/11111")
+    respx_mock.get(f"{API}/records/11111").mock(return_value=json_response(response))
+    result = connector.get_metadata("https://zenodo.org/records/11111")
 
     assert result.description == "This is bold and italic ."
     assert "<" not in result.description
 
 
-# -- Download --
+def test_get_metadata_revalidates_cached_record(connector, monkeypatch, respx_mock):
+    route = respx_mock.get(f"{API}/records/12345").mock(
+        side_effect=[
+            json_response(RECORD_RESPONSE, headers={"ETag": '"v1"'}),
+            httpx.Response(304),
+        ]
+    )
 
+    first = connector.get_metadata("https://zenodo.org/records/12345")
+    first.keywords.append("mutated")
+    second = connector.get_metadata("12345")
 
-def test_download_creates_file(connector, tmp_path):
-    content = b"fake zenodo file content"
+    # The second fetch is conditional and reuses the parsed record, unmutated
+    sent = [call.request.headers.get("If-None-Match") for call in route.calls]
+    assert sent == [None, '"v1"']
+    assert second.source_url == "12345"
+    assert second.keywords == EXPECTED_RECORD["keywords"]
+    assert second.files == EXPECTED_RECORD["files"]
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
 
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://zenodo.org/api/files/bucket1/interviews.qdpx",
-            str(tmp_path),
+def test_get_metadata_updates_cached_record_in_place(connector, monkeypatch, respx_mock):
+    monkeypatch.setattr("pipeline.connectors.zenodo.RECORD_CACHE_SIZE", 2)
+    for i in (1, 2):
+        respx_mock.get(f"{API}/records/{i}").mock(
+            return_value=json_response({"metadata": {}}, headers={"ETag": f'"{i}"'})
         )
 
-    assert path == str(tmp_path / "interviews.qdpx")
-    assert (tmp_path / "interviews.qdpx").read_bytes() == content
+    connector.get_metadata("1")
+    connector.get_metadata("2")
+    connector.get_metadata("2")  # a full refetch of a cached record evicts nothing
 
+    assert list(connector._records) == ["1", "2"]
 
-def test_download_explicit_filename(connector, tmp_path):
-    content = b"data"
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.iter_bytes = MagicMock(return_value=iter([content]))
-    mock_response.__enter__ = MagicMock(return_value=mock_response)
-    mock_response.__exit__ = MagicMock(return_value=False)
-
-    with patch("httpx.stream", return_value=mock_response):
-        path = connector.download(
-            "https://zenodo.org/api/files/bucket1/interviews.qdpx",
-            str(tmp_path),
-            filename="custom_name.qdpx",
+class _SlowDict(dict):
+    """Dict that pauses inside len() and iteration, widening check/insert races."""
+
+    def __len__(self):
+        size = super().__len__()
+        time.sleep(0.001)
+        return size
+
+    def __iter__(self):
+        keys = super().__iter__()
+        time.sleep(0.001)
+        yield from keys
+
+
+def test_get_metadata_concurrent_cache_eviction(connector, monkeypatch, respx_mock):
+    monkeypatch.setattr("pipeline.connectors.zenodo.RECORD_CACHE_SIZE", 2)
+    monkeypatch.setattr(connector, "_records", _SlowDict())
+    ids = range(40)
+    for i in ids:
+        respx_mock.get(f"{API}/records/{i}").mock(
+            return_value=json_response({"metadata": {"title": str(i)}}, headers={"ETag": f'"{i}"'})
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(connector.get_metadata, [str(i) for i in ids]))
+
+    assert [r.title for r in results] == [str(i) for i in ids]
+    assert len(connector._records) == 2
+
+
+def test_get_metadata_many_keeps_input_order(connector, respx_mock):
+    for i in (3, 1, 2):
+        respx_mock.get(f"{API}/records/{i}").mock(
+            return_value=json_response({"id": i, "metadata": {"title": f"Record {i}"}})
         )
 
-    assert path == str(tmp_path / "custom_name.qdpx")
-    assert (tmp_path / "custom_name.qdpx").read_bytes() == content
+    results = connector.get_metadata_many([f"https://zenodo.org/records/{i}" for i in (3, 1, 2)])
+
+    assert [r.title for r in results] == ["Record 3", "Record 1", "Record 2"]
+
+
+def test_get_metadata_many_cancels_after_failure(connector, respx_mock):
+    def slow_record(request):
+        time.sleep(0.05)
+        return json_response({"metadata": {}})
+
+    respx_mock.get(f"{API}/records/0").mock(return_value=httpx.Response(404))
+    routes = [
+        respx_mock.get(f"{API}/records/{i}").mock(side_effect=slow_record)
+        for i in range(1, 40)
+    ]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        connector.get_metadata_many([str(i) for i in range(40)])
+
+    # Only fetches already running when the 404 arrived were sent
+    assert sum(route.call_count for route in routes) < len(routes)
+
+
+# -- Download --
+
+FILE_URL = "https://zenodo.org/api/files/bucket1/interviews.qdpx"
+
+
+def test_download_creates_file(connector, dl_dir, respx_mock):
+    content = b"fake zenodo file content"
+
+    respx_mock.get(FILE_URL).mock(return_value=httpx.Response(200, content=content))
+    path = connector.download(FILE_URL, str(dl_dir))
+
+    assert path == str(dl_dir / "interviews.qdpx")
+    assert (dl_dir / "interviews.qdpx").read_bytes() == content
+
+
+def test_download_explicit_filename(connector, dl_dir, respx_mock):
+    content = b"data"
+
+    respx_mock.get(FILE_URL).mock(return_value=httpx.Response(200, content=content))
+    path = connector.download(FILE_URL, str(dl_dir), filename="custom_name.qdpx")
+
+    assert path == str(dl_dir / "custom_name.qdpx")
+    assert (dl_dir / "custom_name.qdpx").read_bytes() == content
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 8192])
+def test_download_reassembles_chunks(connector, dl_dir, respx_mock, chunk_size):
+    content = bytes(range(256)) * 4
+    # An iterator body is streamed to the connector chunk by chunk
+    chunks = (content[i : i + chunk_size] for i in range(0, len(content), chunk_size))
+
+    respx_mock.get(FILE_URL).mock(return_value=httpx.Response(200, content=chunks))
+    path = connector.download(FILE_URL, str(dl_dir))
+
+    assert (dl_dir / "interviews.qdpx").read_bytes() == content
+    assert path == str(dl_dir / "interviews.qdpx")
 
 
 # -- Helpers --
 
 
-def test_extract_record_id_from_url():
-    assert _extract_record_id("https://zenodo.org/records/12345") == "12345"
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://zenodo.org/records/12345", "12345"),
+        ("https://zenodo.org/record/12345", "12345"),
+        ("12345", "12345"),
+        ("https://zenodo.org/records/12345/files/a.qdpx", "12345"),
+        (" 12345/", "12345"),
+    ],
+)
+def test_extract_record_id(url, expected):
+    assert _extract_record_id(url) == expected
+
+
+@pytest.mark.parametrize(
+    "creators, expected",
+    [
+        ([{"name": "Smith, J."}, {"name": "Doe, A."}], "Smith, J.; Doe, A."),
+        ([{"name": "Smith, J."}, {"name": ""}, {"affiliation": "Uni"}], "Smith, J."),
+        ([], ""),
+    ],
+)
+def test_join_creators(creators, expected):
+    assert _join_creators(creators) == expected
+
+
+@pytest.mark.parametrize(
+    "name", ["interviews.qdpx", "data.tar.gz", "README", ".hidden", "trailing.", "dir.v2/notes", ""]
+)
+def test_file_extension_matches_path_suffix(name):
+    assert _file_extension(name) == Path(name).suffix.lstrip(".")
 
 
-def test_extract_record_id_from_record_url():
-    assert _extract_record_id("https://zenodo.org/record/12345") == "12345"
+def test_rate_limiter_allows_burst_then_waits(monkeypatch):
+    monkeypatch.setattr("pipeline.connectors.zenodo.MIN_REQUEST_INTERVAL", 2.0)
+    sleeps = _record_sleeps(monkeypatch)
+    limiter = _RateLimiter(3)
 
+    for _ in range(4):
+        limiter.acquire()
 
-def test_extract_record_id_bare_number():
-    assert _extract_record_id("12345") == "12345"
+    # Three tokens spent back to back; the fourth request waits for a refill
+    assert len(sleeps) == 1
+    assert 0 < sleeps[0] <= 2.0
 
 
-def test_strip_html():
-    assert _strip_html("<p>Hello <b>world</b></p>") == "Hello world"
-    assert _strip_html("no tags") == "no tags"
-    assert _strip_html("") == ""
+def test_rate_limiter_waits_for_reset_when_quota_spent(monkeypatch):
+    sleeps = _record_sleeps(monkeypatch)
+    limiter = _RateLimiter(3)
 
+    limiter.update_from_headers({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "0"})
+    limiter.acquire()
+    assert sleeps == []
 
-# -- Connector registry --
+    reset = str(time.time() + 30)
+    limiter.update_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    limiter.acquire()
+    assert len(sleeps) == 1
+    assert 25 < sleeps[0] <= 30
 
 
-def test_connector_registry():
-    from pipeline.connectors import CONNECTORS
+def test_rate_limiter_caps_reset_wait(monkeypatch):
+    sleeps = _record_sleeps(monkeypatch)
+    limiter = _RateLimiter(3)
 
-    assert "zenodo" in CONNECTORS
-    assert isinstance(CONNECTORS["zenodo"], ZenodoConnector)
+    # A reset time in milliseconds lies ~50,000 years ahead
+    reset = str(time.time() * 1000)
+    limiter.update_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    limiter.acquire()
+    assert len(sleeps) == 1
+    assert 0 < sleeps[0] <= MAX_RETRY_AFTER